@@ -3,8 +3,11 @@ import rasterio as rio
 import matplotlib.pyplot as plt
 import numpy as np
 
+from src.raster_io import read_decimated
+
 with rio.open('outputs/ratio_post_nov2024.tif') as src:
-    data = src.read(1)
+    # Read at display size (~1500 px longest side); served from overviews when present
+    data = read_decimated(src, 1500).filled(np.nan)
     
 plt.figure(figsize=(10, 8))
 plt.imshow(data, cmap='RdYlGn', vmin=-25, vmax=-5)
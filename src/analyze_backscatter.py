@@ -9,75 +9,353 @@ It pairs VV and VH from the same granule/date within each period.
 """
 from __future__ import annotations
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
 import re
 import csv
+import contextlib
+import functools
 import math
+import os
+import threading
 import click
 import numpy as np
 import rasterio as rio
+from rasterio.enums import Resampling
+from rasterio.windows import Window
+if __name__ == '__main__':
+    # Batch use: render straight to files without an interactive backend
+    import matplotlib
+    matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from matplotlib.colors import Normalize
+
+from raster_io import read_decimated
+
+try:
+    import pyarrow as pa  # optional: parquet sidecar for the parsed manifest
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover
+    pa = pq = None  # type: ignore
 
 
 def _read_band(path: Path) -> Tuple[np.ndarray, dict]:
     with rio.open(path) as ds:
-        arr = ds.read(1).astype('float32')
+        # GDAL converts while decoding; no intermediate array in the source dtype
+        arr = ds.read(1, out_dtype='float32')
         prof = ds.profile
         nodata = ds.nodata
-    if nodata is not None:
-        arr = np.where(arr == nodata, np.nan, arr)
+    _mask_nodata(arr, nodata)
     return arr, prof
 
 
-def _write_tif(path: Path, arr: np.ndarray, profile: dict) -> None:
+# Target pixel count per processing window (~4 MB of float32).
+WINDOW_PIXELS = 1024 * 1024
+
+# Internal tile size and overview levels of the GeoTIFFs written here.
+OUTPUT_BLOCK = 512
+OVERVIEW_FACTORS = [2, 4, 8, 16]
+
+# Elements per kernel chunk (3 float32 operands ~768 KB, sized for L2).
+KERNEL_CHUNK = 64 * 1024
+
+# Worker threads for the windowed kernels (rasterio I/O and ufuncs release the GIL).
+MAX_WORKERS = os.cpu_count() or 1
+
+# GDAL settings for the windowed loops. rasterio environments are
+# thread-local, so every worker thread enters its own copy.
+GDAL_ENV = dict(
+    GDAL_CACHEMAX=1024,
+    GDAL_NUM_THREADS='ALL_CPUS',
+    GDAL_TIFF_INTERNAL_MASK=True,
+    VSI_CACHE=True,
+    VSI_CACHE_SIZE=256 * 1024 * 1024,
+    # Memory-map uncompressed input TIFFs instead of copying through the block cache
+    GTIFF_VIRTUAL_MEM_IO='IF_ENOUGH_RAM',
+)
+
+# Histogram used for streaming percentiles of the clipped delta (0.01 dB bins).
+DELTA_CLIP = 10.0
+DELTA_BINS = 2000
+
+
+def _align_unit(block: int) -> int:
+    """Smallest step that is whole source blocks and whole output tiles."""
+    unit = math.lcm(block, OUTPUT_BLOCK)
+    return unit if unit <= 4 * OUTPUT_BLOCK else OUTPUT_BLOCK
+
+
+def _iter_windows(ds, target: int = WINDOW_PIXELS) -> Iterator[Window]:
+    """Yield windows aligned to the source blocks and the output tiles.
+
+    Tiled sources are grouped into roughly ``target``-pixel chunks of whole
+    tiles; striped sources are read as full-width runs of whole strips.
+    Keeping windows on output tile boundaries means each compressed tile is
+    written exactly once.
+    """
+    bh, bw = ds.block_shapes[0]
+    unit_r = _align_unit(bh)
+    if bw >= ds.width:
+        step_c = ds.width
+        step_r = max(unit_r, (target // ds.width) // unit_r * unit_r)
+    else:
+        unit_c = _align_unit(bw)
+        side = int(math.sqrt(target))
+        step_c = max(unit_c, side // unit_c * unit_c)
+        step_r = max(unit_r, side // unit_r * unit_r)
+    for row in range(0, ds.height, step_r):
+        h = min(step_r, ds.height - row)
+        for col in range(0, ds.width, step_c):
+            yield Window(col, row, min(step_c, ds.width - col), h)
+
+
+def _view(buf: np.ndarray, win: Window) -> np.ndarray:
+    """Contiguous 2-D view into a flat scratch buffer sized for ``win``."""
+    h, w = int(win.height), int(win.width)
+    return buf[:h * w].reshape(h, w)
+
+
+def _read_window(ds, win: Window, buf: np.ndarray) -> np.ndarray:
+    arr = _view(buf, win)
+    ds.read(1, window=win, out=arr)
+    return arr
+
+
+def _mask_nodata(arr: np.ndarray, nodata: Optional[float]) -> None:
+    """Set nodata pixels to NaN in place."""
+    if nodata is not None:
+        arr[arr == nodata] = np.nan
+
+
+def _ratio_db(vh: np.ndarray, vv: np.ndarray, nodata_vh: Optional[float],
+              nodata_vv: Optional[float], out: np.ndarray) -> np.ndarray:
+    """10*log10((vh+eps)/(vv+eps)) into ``out``; ``vh``/``vv`` are scratch and ``out`` may alias ``vh``."""
+    eps = 1e-6
+    _mask_nodata(vh, nodata_vh)
+    _mask_nodata(vv, nodata_vv)
+    np.add(vh, eps, out=vh)
+    np.add(vv, eps, out=vv)
+    np.divide(vh, vv, out=out)
+    np.log10(out, out=out)
+    np.multiply(out, 10.0, out=out)
+    return out
+
+
+def _create_output(path: Path, profile: dict):
+    """Open a tiled, compressed float32 GeoTIFF for windowed writing."""
     p = profile.copy()
-    p.update(dtype='float32', count=1, compress='deflate')
+    p.update(dtype='float32', count=1, tiled=True, blockxsize=OUTPUT_BLOCK, blockysize=OUTPUT_BLOCK,
+             compress='zstd', zstd_level=1, predictor=3, num_threads='ALL_CPUS', bigtiff='IF_SAFER')
     path.parent.mkdir(parents=True, exist_ok=True)
-    with rio.open(path, 'w', **p) as dst:
-        dst.write(arr.astype('float32'), 1)
+    # Unlink ourselves: GDAL's delete-if-exists also removes files it guesses are
+    # sidecars (e.g. outputs/summary.txt), and races when two outputs share a dir.
+    path.unlink(missing_ok=True)
+    try:
+        return rio.open(path, 'w', **p)
+    except rio.errors.RasterioIOError:
+        # GDAL built without ZSTD
+        p.pop('zstd_level')
+        p.update(compress='lzw')
+        return rio.open(path, 'w', **p)
+
+
+def _build_overviews(dst) -> None:
+    dst.build_overviews(OVERVIEW_FACTORS, Resampling.average)
+    dst.update_tags(ns='rio_overview', resampling='average')
+
+
+def _delta_db(pre: np.ndarray, post: np.ndarray, nodata_pre: Optional[float],
+              nodata_post: Optional[float], out: np.ndarray) -> np.ndarray:
+    """clip(post - pre, -DELTA_CLIP, DELTA_CLIP) into ``out``, which may alias ``pre``."""
+    _mask_nodata(pre, nodata_pre)
+    _mask_nodata(post, nodata_post)
+    np.subtract(post, pre, out=out)
+    np.clip(out, -DELTA_CLIP, DELTA_CLIP, out=out)
+    return out
+
+
+def _apply_blocked(kernel: Callable, arrs: List[np.ndarray], nodatas: List[Optional[float]],
+                   out: np.ndarray) -> None:
+    """Run an elementwise ``kernel`` over cache-sized chunks of a window.
+
+    Each kernel makes several ufunc passes; on KERNEL_CHUNK elements they all
+    stay in L2 instead of streaming the whole window through memory per pass.
+    """
+    flat_in = [a.reshape(-1) for a in arrs]
+    flat_out = out.reshape(-1)
+    for i in range(0, flat_out.size, KERNEL_CHUNK):
+        sl = slice(i, i + KERNEL_CHUNK)
+        kernel(*(a[sl] for a in flat_in), *nodatas, flat_out[sl])
+
+
+def _new_stats() -> dict:
+    return {'n': 0, 'mean': 0.0, 'm2': 0.0, 'hist': np.zeros(DELTA_BINS, dtype=np.int64)}
+
+
+def _merge_stats(a: dict, b: dict) -> None:
+    """Merge running stats ``b`` into ``a`` (Chan et al. pairwise update of n/mean/M2)."""
+    if b['n'] == 0:
+        return
+    n = a['n'] + b['n']
+    d = b['mean'] - a['mean']
+    a['mean'] += d * b['n'] / n
+    a['m2'] += b['m2'] + d * d * a['n'] * b['n'] / n
+    a['n'] = n
+    a['hist'] += b['hist']
+
+
+def _update_stats(stats: dict, tile: np.ndarray) -> None:
+    """Fold one window of clipped delta into running mean/M2 and the histogram."""
+    vals = tile[np.isfinite(tile)]
+    if vals.size == 0:
+        return
+    mean = float(np.add.reduce(vals, dtype=np.float64)) / vals.size
+    # Deviations in float64 so the ~1M-term sum of squares keeps the baseline's precision
+    dev = np.subtract(vals, mean, dtype=np.float64)
+    m2 = float(np.dot(dev, dev))
+    idx = np.multiply(np.add(vals, DELTA_CLIP, out=dev), DELTA_BINS / (2 * DELTA_CLIP), out=dev)
+    idx = np.clip(idx.astype(np.int32), 0, DELTA_BINS - 1)
+    hist = np.bincount(idx, minlength=DELTA_BINS)
+    _merge_stats(stats, {'n': vals.size, 'mean': mean, 'm2': m2, 'hist': hist})
+
+
+def _process_windows(src_paths: List[Path], windows: List[Window], kernel: Callable,
+                     dst, lock: threading.Lock, with_stats: bool, env: dict) -> Optional[dict]:
+    """Worker: run ``kernel`` over ``windows`` with private dataset handles and buffers.
+
+    Kernels write their result over the first input buffer, so no separate
+    output buffer is needed.
+    """
+    if not windows:
+        return None
+    stats = _new_stats() if with_stats else None
+    size = max(int(w.width) * int(w.height) for w in windows)
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(rio.Env(**env))
+        srcs = [stack.enter_context(rio.open(p, sharing=False)) for p in src_paths]
+        bufs = [np.empty(size, dtype='float32') for _ in srcs]
+        nodatas = [ds.nodata for ds in srcs]
+        for win in windows:
+            arrs = [_read_window(ds, win, buf) for ds, buf in zip(srcs, bufs)]
+            out = arrs[0]
+            _apply_blocked(kernel, arrs, nodatas, out)
+            with lock:
+                dst.write(out, 1, window=win)
+            if stats is not None:
+                _update_stats(stats, out)
+    return stats
+
+
+def _run_windowed(src_paths: List[Path], output_tif: Path, kernel: Callable,
+                  with_stats: bool = False, workers: int = MAX_WORKERS) -> Optional[dict]:
+    """Apply ``kernel`` window-by-window across ``src_paths`` on a thread pool.
+
+    Windows are dealt round-robin to the workers; writes to the shared output
+    are serialized with a lock. Returns merged delta stats if ``with_stats``.
+    ``workers`` is the CPU budget of this call: it caps the pool, and GDAL's
+    codec threads get the share of it each worker leaves over.
+    """
+    with rio.Env(**GDAL_ENV), rio.open(src_paths[0]) as ref:
+        profile = ref.profile
+        windows = list(_iter_windows(ref))
+    n_workers = max(1, min(workers, len(windows)))
+    env = dict(GDAL_ENV, GDAL_NUM_THREADS=max(1, workers // n_workers))
+    lock = threading.Lock()
+    with rio.Env(**env), _create_output(output_tif, profile) as dst:
+        with ThreadPoolExecutor(max_workers=n_workers) as ex:
+            futures = [ex.submit(_process_windows, src_paths, windows[i::n_workers], kernel,
+                                 dst, lock, with_stats, env) for i in range(n_workers)]
+            results = [f.result() for f in futures]
+        _build_overviews(dst)
+    if not with_stats:
+        return None
+    stats = _new_stats()
+    for r in results:
+        if r is not None:
+            _merge_stats(stats, r)
+    return stats
 
 
-def compute_vh_vv_ratio(vv_tif: Path, vh_tif: Path, output_tif: Path) -> None:
-    """Compute 10*log10(VH/VV) with epsilon for stability."""
-    vh, prof = _read_band(vh_tif)
-    vv, _ = _read_band(vv_tif)
-    eps = 1e-6
-    ratio_db = 10.0 * np.log10((vh + eps) / (vv + eps))
-    _write_tif(output_tif, ratio_db, prof)
+def compute_vh_vv_ratio(vv_tif: Path, vh_tif: Path, output_tif: Path, workers: int = MAX_WORKERS) -> None:
+    """Compute 10*log10(VH/VV) with epsilon for stability, window by window."""
+    _run_windowed([vh_tif, vv_tif], output_tif, _ratio_db, workers=workers)
 
 
-def compute_change(pre_ratio_tif: Path, post_ratio_tif: Path, output_tif: Path) -> Dict[str, float]:
-    pre, prof = _read_band(pre_ratio_tif)
-    post, _ = _read_band(post_ratio_tif)
-    delta = post - pre
-    delta = np.clip(delta, -10.0, 10.0)
-    _write_tif(output_tif, delta, prof)
-    vals = delta[np.isfinite(delta)]
-    if vals.size == 0:
+def _hist_percentile(hist: np.ndarray, n: int, q: float) -> float:
+    """q-th percentile from the clipped-delta histogram, interpolated within the bin."""
+    cum = np.cumsum(hist)
+    target = q / 100.0 * n
+    idx = min(int(np.searchsorted(cum, target)), DELTA_BINS - 1)
+    below = cum[idx - 1] if idx > 0 else 0
+    frac = (target - below) / hist[idx] if hist[idx] else 0.5
+    width = 2 * DELTA_CLIP / DELTA_BINS
+    return float(-DELTA_CLIP + (idx + frac) * width)
+
+
+def _finish_stats(stats: dict) -> Dict[str, float]:
+    n = stats['n']
+    if n == 0:
         return {'mean': float('nan'), 'std': float('nan'), 'p5': float('nan'), 'p95': float('nan')}
     return {
-        'mean': float(np.nanmean(vals)),
-        'std': float(np.nanstd(vals)),
-        'p5': float(np.nanpercentile(vals, 5)),
-        'p95': float(np.nanpercentile(vals, 95)),
+        'mean': stats['mean'],
+        'std': math.sqrt(stats['m2'] / n),
+        'p5': _hist_percentile(stats['hist'], n, 5),
+        'p95': _hist_percentile(stats['hist'], n, 95),
     }
 
 
+def compute_change(pre_ratio_tif: Path, post_ratio_tif: Path, output_tif: Path) -> Dict[str, float]:
+    """Write clip(post - pre) and return its mean/std/p5/p95, streaming by window."""
+    with rio.open(pre_ratio_tif) as pre_ds, rio.open(post_ratio_tif) as post_ds:
+        if pre_ds.shape != post_ds.shape:
+            raise ValueError(f'Ratio grids differ: {pre_ds.shape} vs {post_ds.shape}')
+    stats = _run_windowed([pre_ratio_tif, post_ratio_tif], output_tif, _delta_db, with_stats=True)
+    return _finish_stats(stats)
+
+
+# Longest side of each comparison panel in pixels (4 in at 150 dpi).
+PREVIEW_SIDE = 600
+
+
+def _read_preview(path: Path, max_side: int = PREVIEW_SIDE) -> np.ndarray:
+    """Read band 1 averaged down to at most ``max_side`` pixels, nodata as NaN.
+
+    GDAL serves the read from the closest overview when the file has them.
+    """
+    with rio.open(path) as ds:
+        return read_decimated(ds, max_side).filled(np.nan)
+
+
+def _read_previews(paths: List[Path], max_side: int = PREVIEW_SIDE) -> List[np.ndarray]:
+    """Preview-read several rasters at once, one file handle each, overlapped on threads."""
+    def read(path: Path) -> np.ndarray:
+        with rio.Env(**GDAL_ENV):
+            return _read_preview(path, max_side)
+
+    with ThreadPoolExecutor(max_workers=len(paths)) as ex:
+        return list(ex.map(read, paths))
+
+
 def plot_comparison(pre_tif: Path, post_tif: Path, delta_tif: Path, output_png: Path) -> None:
-    pre, _ = _read_band(pre_tif)
-    post, _ = _read_band(post_tif)
-    delta, _ = _read_band(delta_tif)
+    pre, post, delta = _read_previews([pre_tif, post_tif, delta_tif])
+
+    # One normalization for both ratio panels: computed once and comparable
+    finite = [a[np.isfinite(a)] for a in (pre, post)]
+    finite = [a for a in finite if a.size]
+    if finite:
+        ratio_norm = Normalize(min(float(a.min()) for a in finite), max(float(a.max()) for a in finite))
+    else:
+        ratio_norm = Normalize()
 
     fig, axes = plt.subplots(1, 3, figsize=(12, 4), constrained_layout=True)
-    im0 = axes[0].imshow(pre, cmap='RdYlGn')
+    im0 = axes[0].imshow(pre, cmap='RdYlGn', norm=ratio_norm)
     axes[0].set_title('VH/VV (pre) [dB]'); axes[0].axis('off')
-    fig.colorbar(im0, ax=axes[0], shrink=0.7)
 
-    im1 = axes[1].imshow(post, cmap='RdYlGn')
+    axes[1].imshow(post, cmap='RdYlGn', norm=ratio_norm)
     axes[1].set_title('VH/VV (post) [dB]'); axes[1].axis('off')
-    fig.colorbar(im1, ax=axes[1], shrink=0.7)
+    fig.colorbar(im0, ax=axes[:2], shrink=0.7)
 
-    im2 = axes[2].imshow(delta, cmap='RdBu_r', vmin=-10, vmax=10)
+    im2 = axes[2].imshow(delta, cmap='RdBu_r', norm=Normalize(-DELTA_CLIP, DELTA_CLIP))
     axes[2].set_title('Δ VH/VV (post - pre) [dB]'); axes[2].axis('off')
     fig.colorbar(im2, ax=axes[2], shrink=0.7)
 
@@ -95,25 +373,29 @@ def _parse_pol_from_name(path: Path) -> Optional[str]:
     return None
 
 
+# YYYY-MM-DD or compact YYYYMMDD, whichever appears first in the path
+_DATE_RE = re.compile(r'(?P<iso>20\d{2}-\d{2}-\d{2})|(?P<y>20\d{2})(?P<m>\d{2})(?P<d>\d{2})')
+
+
 def _parse_date_from_name(path: Path) -> Optional[str]:
-    # Try YYYY-MM-DD anywhere in path
-    m = re.search(r'(20\d{2}-\d{2}-\d{2})', path.as_posix())
-    if m:
-        return m.group(1)
-    # Try compact YYYYMMDD in filename
-    m2 = re.search(r'(20\d{2})(\d{2})(\d{2})', path.name)
-    if m2:
-        y, mo, d = m2.groups()
-        return f"{y}-{mo}-{d}"
-    return None
+    m = _DATE_RE.search(path.as_posix())
+    if not m:
+        return None
+    if m.group('iso'):
+        return m.group('iso')
+    return f"{m['y']}-{m['m']}-{m['d']}"
 
 
-def _pair_files_by_date(manifest_path: Path) -> Dict[str, Dict[str, Dict[str, Path]]]:
-    """Return dict[period][date]['VV'|'VH'] = Path using CSV with filename fallback."""
-    pairs: Dict[str, Dict[str, Dict[str, Path]]] = {}
-    with manifest_path.open() as f:
-        r = csv.DictReader(f)
-        for row in r:
+_MANIFEST_COLUMNS = ['filename', 'pol', 'date', 'period']
+# Schema metadata of the parquet sidecar; bump the version whenever the columns
+# or _parse_manifest_csv change so sidecars written by older code are rebuilt.
+_SIDECAR_KEY, _SIDECAR_VERSION = b'manifest_rows_version', b'1'
+
+
+def _parse_manifest_csv(path: str) -> List[Tuple[str, str, str, str]]:
+    rows = []
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
             fn = Path(row['filename'])
             pol_csv = (row.get('polarization') or '').upper()
             date_csv = (row.get('date') or '')
@@ -123,25 +405,59 @@ def _pair_files_by_date(manifest_path: Path) -> Dict[str, Dict[str, Dict[str, Pa
             date = date_csv if date_csv else (_parse_date_from_name(fn) or '')
             if pol not in ('VV', 'VH') or not date:
                 continue
-            pairs.setdefault(period, {}).setdefault(date, {})[pol] = fn
+            rows.append((row['filename'], pol, date, period))
+    return rows
+
+
+@functools.lru_cache(maxsize=8)
+def _load_manifest_rows(path: str, mtime_ns: int) -> Tuple[Tuple[Path, str, str, str], ...]:
+    """Parse the manifest into (filename, pol, date, period) rows with complete VV/VH + date.
+
+    ``mtime_ns`` is part of the cache key so an edited manifest is re-read.
+    With pyarrow installed the parsed rows are also kept in a ``.parquet``
+    sidecar next to the CSV, reused by later runs while it is not older
+    than the CSV and carries the current ``_SIDECAR_VERSION``.
+    """
+    sidecar = Path(path).with_suffix('.parquet')
+    table = None
+    if pq is not None and sidecar.exists() and sidecar.stat().st_mtime_ns >= mtime_ns:
+        table = pq.read_table(sidecar)
+        if (table.schema.metadata or {}).get(_SIDECAR_KEY) != _SIDECAR_VERSION:
+            table = None  # written by an older parser: rebuild
+    if table is not None:
+        table = table.to_pydict()
+        rows = list(zip(*(table[c] for c in _MANIFEST_COLUMNS)))
+    else:
+        rows = _parse_manifest_csv(path)
+        if pq is not None:
+            schema = pa.schema([(c, pa.string()) for c in _MANIFEST_COLUMNS],
+                               metadata={_SIDECAR_KEY: _SIDECAR_VERSION})
+            table = pa.table({c: [r[i] for r in rows] for i, c in enumerate(_MANIFEST_COLUMNS)},
+                             schema=schema)
+            try:
+                pq.write_table(table, sidecar)
+            except OSError:
+                pass  # read-only data dir; the in-process cache still applies
+    return tuple((Path(fn), pol, date, period) for fn, pol, date, period in rows)
+
+
+def _manifest_rows(manifest_path: Path) -> Tuple[Tuple[Path, str, str, str], ...]:
+    return _load_manifest_rows(str(manifest_path), manifest_path.stat().st_mtime_ns)
+
+
+def _pair_files_by_date(manifest_path: Path) -> Dict[str, Dict[str, Dict[str, Path]]]:
+    """Return dict[period][date]['VV'|'VH'] = Path using CSV with filename fallback."""
+    pairs: Dict[str, Dict[str, Dict[str, Path]]] = {}
+    for fn, pol, date, period in _manifest_rows(manifest_path):
+        pairs.setdefault(period, {}).setdefault(date, {})[pol] = fn
     return pairs
 
 
 def _pair_all_dates(manifest_path: Path) -> Dict[str, Dict[str, Path]]:
     """Return dict[date]['VV'|'VH'] = Path across all periods (ignore period)."""
     pairs: Dict[str, Dict[str, Path]] = {}
-    with manifest_path.open() as f:
-        r = csv.DictReader(f)
-        for row in r:
-            fn = Path(row['filename'])
-            pol_csv = (row.get('polarization') or '').upper()
-            date_csv = (row.get('date') or '')
-
-            pol = pol_csv if pol_csv in ('VV', 'VH') else (_parse_pol_from_name(fn) or '')
-            date = date_csv if date_csv else (_parse_date_from_name(fn) or '')
-            if pol not in ('VV', 'VH') or not date:
-                continue
-            pairs.setdefault(date, {})[pol] = fn
+    for fn, pol, date, _period in _manifest_rows(manifest_path):
+        pairs.setdefault(date, {})[pol] = fn
     return pairs
 
 def _find_two_periods(pairs: Dict[str, Dict[str, Dict[str, Path]]], pre_name: str, post_name: str) -> Tuple[Optional[Tuple[str, Dict[str, Path]]], Optional[Tuple[str, Dict[str, Path]]]]:
@@ -199,13 +515,20 @@ def main(manifest: str, output_dir: str, pre: str, post: str, make_plots: bool,
     ratio_post = outdir / f'ratio_{post_label}_{post_date}.tif'
     delta = outdir / f'ratio_delta_{pre_label}_to_{post_label}.tif'
 
-    compute_vh_vv_ratio(pre_bands['VV'], pre_bands['VH'], ratio_pre)
-    compute_vh_vv_ratio(post_bands['VV'], post_bands['VH'], ratio_post)
-    stats = compute_change(ratio_pre, ratio_post, delta)
-    print('Delta stats:', stats)
-
-    if make_plots:
-        plot_comparison(ratio_pre, ratio_post, delta, outdir / f'ratio_compare_{pre_label}_vs_{post_label}.png')
+    with rio.Env(**GDAL_ENV):
+        # Pre and post ratios touch disjoint files, so compute them concurrently,
+        # each on half of the worker budget
+        half = max(1, MAX_WORKERS // 2)
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            jobs = [ex.submit(compute_vh_vv_ratio, pre_bands['VV'], pre_bands['VH'], ratio_pre, half),
+                    ex.submit(compute_vh_vv_ratio, post_bands['VV'], post_bands['VH'], ratio_post, half)]
+            for job in jobs:
+                job.result()
+        stats = compute_change(ratio_pre, ratio_post, delta)
+        print('Delta stats:', stats)
+
+        if make_plots:
+            plot_comparison(ratio_pre, ratio_post, delta, outdir / f'ratio_compare_{pre_label}_vs_{post_label}.png')
 
 
 if __name__ == '__main__':
@@ -12,56 +12,83 @@ Steps:
 Generates a log at outputs/pipeline.log and a summary at outputs/summary.txt
 """
 from __future__ import annotations
-import subprocess
+from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
+import importlib
 import sys
 import time
+import traceback
+
+import click
 
 LOG_PATH = Path('outputs/pipeline.log')
 SUMMARY_PATH = Path('outputs/summary.txt')
 
 
-def run(cmd: list[str], allow_fail: bool = True) -> int:
+def _call(module: str, func: str, args: list[str]) -> None:
+    fn = getattr(importlib.import_module(module), func)
+    if isinstance(fn, click.Command):
+        fn.main(args, prog_name=module, standalone_mode=False)
+    else:
+        fn()
+
+
+def run(module: str, func: str, *args: str, allow_fail: bool = True) -> int:
+    """Run ``module.func`` in this interpreter with CLI-style ``args``, logging its output.
+
+    Steps used to be ``python src/...`` subprocesses. Calling them in-process
+    skips per-step interpreter start-up and re-importing rasterio/numpy/
+    matplotlib, and GDAL's block cache carries over between steps that read
+    the same rasters.
+    """
+    label = ' '.join([module, *args])
     LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
     with LOG_PATH.open('a', encoding='utf-8') as log:
-        log.write(f"\n$ {' '.join(cmd)}\n")
+        log.write(f"\n$ {label}\n")
         log.flush()
-        proc = subprocess.run(cmd, stdout=log, stderr=log, text=True)
-        rc = proc.returncode
-        if rc != 0 and not allow_fail:
-            print('Command failed, see log:', ' '.join(cmd))
-            sys.exit(rc)
-        return rc
+        try:
+            with redirect_stdout(log), redirect_stderr(log):
+                _call(module, func, list(args))
+            rc = 0
+        except SystemExit as e:
+            rc = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            traceback.print_exc(file=log)
+            rc = 1
+    if rc != 0 and not allow_fail:
+        print('Step failed, see log:', label)
+        sys.exit(rc)
+    return rc
 
 
 def main(skip_download: bool = False) -> None:
     LOG_PATH.write_text(f"Pipeline started {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
 
     if not skip_download:
-        run([sys.executable, 'src/submit_hyp3_jobs.py', '--limit', '2'])
+        run('submit_hyp3_jobs', 'main', '--limit', '2')
         print('Submitted jobs. Wait for completion before continuing download step.')
 
-    run([sys.executable, 'src/download_hyp3_results.py'])
+    run('download_hyp3_results', 'main')
 
     # Analyze ratios
     manifest = Path('data/rtc/manifest.csv')
     if manifest.exists():
-        run([sys.executable, 'src/analyze_backscatter.py', '--manifest', str(manifest), '--output-dir', 'outputs', '--make-plots'])
+        run('analyze_backscatter', 'main', '--manifest', str(manifest), '--output-dir', 'outputs', '--make-plots')
         # Stats (best-effort: try recent vs pre if created)
         # create_web_map single and dual
         # Find ratio files
         ratio_pre = next(Path('outputs').glob('ratio_pre_*.tif'), None)
         ratio_recent = next(Path('outputs').glob('ratio_recent_*.tif'), None)
         if ratio_pre and ratio_recent:
-            run([sys.executable, 'src/statistics.py', '--compare', str(ratio_pre), str(ratio_recent), '--out', 'outputs/stats.csv'])
-            run([sys.executable, 'src/create_web_map.py', '--mode', 'dual', '--layers', str(ratio_pre), str(ratio_recent), '--out', 'outputs/dual.html'])
+            run('statistics', 'cli', '--compare', str(ratio_pre), str(ratio_recent), '--out', 'outputs/stats.csv')
+            run('create_web_map', 'main', '--mode', 'dual', '--layers', str(ratio_pre), '--layers', str(ratio_recent), '--out', 'outputs/dual.html')
         # Single map: add delta if available
         delta = next(Path('outputs').glob('ratio_delta_*.tif'), None)
         if delta:
-            run([sys.executable, 'src/create_web_map.py', '--mode', 'single', '--layers', str(delta), '--out', 'outputs/map.html'])
+            run('create_web_map', 'main', '--mode', 'single', '--layers', str(delta), '--out', 'outputs/map.html')
 
     # Export figures
-    run([sys.executable, 'src/export_figures.py'])
+    run('export_figures', 'main')
 
     SUMMARY_PATH.write_text('Pipeline completed. See outputs/ for results and outputs/pipeline.log for logs.\n')
     print('Done. Summary at', SUMMARY_PATH)
@@ -4,11 +4,24 @@ Check status of submitted HyP3 jobs.
 Usage:
   python src/check_status.py
 """
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import json
+import pandas as pd
 from hyp3_sdk import HyP3
+from hyp3_sdk.exceptions import HyP3Error
+from requests import HTTPError
 from datetime import datetime
 
+
+def _is_not_found(err):
+    """True if HyP3 answered 404 for the job, i.e. it no longer exists."""
+    # The SDK raises HyP3Error while handling the HTTPError that carries the response
+    http = err.__cause__ or err.__context__
+    return (isinstance(err, HyP3Error) and isinstance(http, HTTPError)
+            and http.response is not None and http.response.status_code == 404)
+
+
 def main():
     # Load job metadata
     jobs_meta_path = Path('data/hyp3_jobs.json')
@@ -30,76 +43,93 @@ def main():
     # Connect to HyP3
     hyp3 = HyP3()
     
-    # Get job IDs
-    job_ids = [job['job_id'] for job in submitted if job.get('job_id')]
+    # Get job IDs (deduplicated, submission order kept)
+    job_ids = list(dict.fromkeys(job['job_id'] for job in submitted if job.get('job_id')))
     
     if not job_ids:
         print("❌ No valid job IDs found in metadata.")
         return
     
-    # Fetch current status - get all recent jobs and filter by our job IDs
-    try:
-        # Get recent jobs (last 7 days) and filter by our job IDs
-        batch = hyp3.find_jobs()
-        jobs_by_id = {job.job_id: job for job in batch if job.job_id in job_ids}
-    except Exception as e:
-        print(f"❌ Error fetching jobs: {e}")
+    # Fetch current status - look up only our job IDs, several requests in flight
+    def fetch(job_id):
+        try:
+            return hyp3.get_job_by_id(job_id), None
+        except Exception as e:
+            return None, e
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        results = dict(zip(job_ids, ex.map(fetch, job_ids)))
+    jobs_by_id = {job_id: job for job_id, (job, _) in results.items() if job is not None}
+    # Deleted jobs come back as 404; any other error (network, auth, 5xx) is a failed lookup
+    fetch_errors = {job_id: err for job_id, (_, err) in results.items()
+                    if err is not None and not _is_not_found(err)}
+
+    if fetch_errors and not jobs_by_id:
+        print(f"❌ Error fetching jobs: {next(iter(fetch_errors.values()))}")
         return
     
-    # Status counters
-    status_count = {'SUCCEEDED': 0, 'RUNNING': 0, 'PENDING': 0, 'FAILED': 0}
+    # One row per submitted job, live status joined on job_id
+    df = pd.DataFrame(submitted).reindex(columns=['job_id', 'period', 'name'])
+    df[['period', 'name']] = df[['period', 'name']].fillna('unknown')
+    live = pd.Series({job_id: job.status_code for job_id, job in jobs_by_id.items()}, dtype=object)
+    df['status'] = df['job_id'].map(live)
+    df.loc[df['job_id'].isin(list(fetch_errors)), 'status'] = 'FETCH_ERROR'
+    df['status'] = df['status'].fillna('UNKNOWN')
+    status_count = df['status'].value_counts()
+    
+    # Status emoji (Windows-safe)
+    emojis = {
+        'SUCCEEDED': '[OK]',
+        'RUNNING': '[RUN]',
+        'PENDING': '[PEND]',
+        'FAILED': '[FAIL]'
+    }
     
     # Display each job
-    for job_meta in submitted:
-        job_id = job_meta.get('job_id')
-        period = job_meta.get('period', 'unknown')
-        name = job_meta.get('name', 'unknown')
-        
-        if job_id in jobs_by_id:
-            job = jobs_by_id[job_id]
-            status = job.status_code
-            status_count[status] = status_count.get(status, 0) + 1
-            
-            # Status emoji (Windows-safe)
-            emoji = {
-                'SUCCEEDED': '[OK]',
-                'RUNNING': '[RUN]',
-                'PENDING': '[PEND]',
-                'FAILED': '[FAIL]'
-            }.get(status, '[?]')
-            
-            print(f"{emoji} [{period.upper()}] {name[:50]}")
-            print(f"   Status: {status}")
-            print(f"   Job ID: {job_id}")
-            
-            if status == 'SUCCEEDED':
-                if hasattr(job, 'files') and job.files:
-                    print(f"   Files: {len(job.files)} ready for download")
-            elif status == 'FAILED':
-                print(f"   [WARN] Check HyP3 web interface for error details")
-            
-            print()
-        else:
-            print(f"[?] [{period.upper()}] {name[:50]}")
+    for row in df.itertuples(index=False):
+        if row.status == 'UNKNOWN':
+            print(f"[?] [{row.period.upper()}] {row.name[:50]}")
             print(f"   Job ID not found in HyP3 (may have been deleted)")
             print()
+            continue
+        if row.status == 'FETCH_ERROR':
+            print(f"[ERR] [{row.period.upper()}] {row.name[:50]}")
+            print(f"   Job ID: {row.job_id}")
+            print(f"   Could not fetch status: {fetch_errors[row.job_id]}")
+            print()
+            continue
+        
+        print(f"{emojis.get(row.status, '[?]')} [{row.period.upper()}] {row.name[:50]}")
+        print(f"   Status: {row.status}")
+        print(f"   Job ID: {row.job_id}")
+        
+        if row.status == 'SUCCEEDED':
+            job = jobs_by_id[row.job_id]
+            if hasattr(job, 'files') and job.files:
+                print(f"   Files: {len(job.files)} ready for download")
+        elif row.status == 'FAILED':
+            print(f"   [WARN] Check HyP3 web interface for error details")
+        
+        print()
     
     print("=" * 80)
     print("\nSUMMARY:")
-    print(f"  [OK] Succeeded: {status_count['SUCCEEDED']}")
-    print(f"  [RUN] Running:   {status_count['RUNNING']}")
-    print(f"  [PEND] Pending:   {status_count['PENDING']}")
-    print(f"  [FAIL] Failed:    {status_count['FAILED']}")
+    print(f"  [OK] Succeeded: {status_count.get('SUCCEEDED', 0)}")
+    print(f"  [RUN] Running:   {status_count.get('RUNNING', 0)}")
+    print(f"  [PEND] Pending:   {status_count.get('PENDING', 0)}")
+    print(f"  [FAIL] Failed:    {status_count.get('FAILED', 0)}")
+    if fetch_errors:
+        print(f"  [ERR] Not fetched: {status_count.get('FETCH_ERROR', 0)} (run again to retry)")
     
     # Next steps
-    if status_count['SUCCEEDED'] > 0:
+    if status_count.get('SUCCEEDED', 0) > 0:
         print("\n[SUCCESS] Some jobs are complete!")
         print("   Next step: python src/download_hyp3_results.py")
-    elif status_count['RUNNING'] > 0 or status_count['PENDING'] > 0:
+    elif status_count.get('RUNNING', 0) > 0 or status_count.get('PENDING', 0) > 0:
         print("\n[WAIT] Jobs still processing...")
         print("   Check again in 10-15 minutes")
         print("   Or run: hyp3 watch")
-    elif status_count['FAILED'] > 0:
+    elif status_count.get('FAILED', 0) > 0:
         print("\n[WARN] Some jobs failed. Check HyP3 web interface:")
         print("   https://hyp3-sdk.readthedocs.io/")
 
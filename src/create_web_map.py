@@ -6,21 +6,65 @@ Usage:
   python src/create_web_map.py --mode dual --layers outputs/ratio_pre_*.tif outputs/ratio_recent_*.tif --out outputs/dual.html
 """
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple
+import functools
+import hashlib
 import io
+import json
+import os
 import base64
+import string
 import click
 import numpy as np
 import rasterio as rio
 from rasterio.warp import transform_bounds
-from PIL import Image
 import folium
 from folium.plugins import DualMap, MiniMap, Fullscreen, MousePosition, Timeline, TimelineSlider
-from matplotlib import pyplot as plt
-from matplotlib.colors import LinearSegmentedColormap
 
-from config import MAP_CENTER
+from config import MAP_CENTER, OUTPUT_DIRS
+from raster_io import OVERLAY_GDAL_ENV, MAX_OVERLAY_SIDE, PNG_LEVEL, read_decimated
+
+try:
+    import oxipng  # optional: pyoxipng, shrinks the embedded overlay PNGs
+except Exception:  # pragma: no cover
+    oxipng = None  # type: ignore
+
+
+# Eruption marker popup; filled per event with $date, $name and $volume
+_POPUP_TPL = string.Template("""
+        <div style="font-family: 'Courier New', monospace; min-width: 200px;">
+            <h4 style="color: #ff6600; margin: 5px 0; border-bottom: 2px solid #ff6600;">
+                ERUPTION EVENT
+            </h4>
+            <table style="width: 100%; font-size: 12px;">
+                <tr>
+                    <td style="color: #666;"><strong>Date:</strong></td>
+                    <td>$date</td>
+                </tr>
+                <tr>
+                    <td style="color: #666;"><strong>Location:</strong></td>
+                    <td>$name</td>
+                </tr>
+                <tr>
+                    <td style="color: #666;"><strong>Volume:</strong></td>
+                    <td>$volume</td>
+                </tr>
+            </table>
+            <p style="font-size: 10px; color: #999; margin-top: 10px;">
+                Source: Icelandic Met Office
+            </p>
+        </div>
+        """)
+
+
+# Encoded overlays, reused while the source tif and render settings are unchanged
+OVERLAY_CACHE_DIR = Path(OUTPUT_DIRS['outputs']) / '.cache'
+# Part of the cache key; bump when _encode_overlay renders the same inputs differently
+OVERLAY_CACHE_VERSION = 3
+# Bins for the stretch percentiles; resolution is (max - min) / STRETCH_BINS
+STRETCH_BINS = 4096
 
 
 # Known eruption data for Reykjanes Peninsula 2024-2025
@@ -35,8 +79,11 @@ ERUPTIONS = [
 
 
 # NASA-inspired colormap for SAR data
+@functools.lru_cache(maxsize=8)
 def create_nasa_colormap(cmap_type='ratio'):
     """Create NASA-style colormaps for different data types."""
+    from matplotlib.colors import LinearSegmentedColormap  # deferred: matplotlib is slow to import
+    
     if cmap_type == 'ratio':
         colors = ['#004d00', '#00b300', '#80ff00', '#ffff00', '#ff9900', '#ff6600']
         return LinearSegmentedColormap.from_list('nasa_ratio', colors)
@@ -47,21 +94,102 @@ def create_nasa_colormap(cmap_type='ratio'):
         return 'viridis'
 
 
+# PNG palette: entry 0 is the transparent no-data colour, 1..255 carry the data
+PALETTE_LEVELS = 255
+GRAY_PALETTE = np.vstack([[0, 0, 0], np.repeat(np.linspace(0, 255, PALETTE_LEVELS)[:, None], 3, axis=1)]).astype('uint8')
+
+
+def _colormap_lut(cmap) -> np.ndarray:
+    """256x3 uint8 PNG palette for a matplotlib colormap, built once per colormap object."""
+    if not hasattr(cmap, 'lut_u8'):
+        rgb = (cmap(np.linspace(0, 1, PALETTE_LEVELS))[:, :3] * 255).astype('uint8')
+        cmap.lut_u8 = np.vstack([[0, 0, 0], rgb]).astype('uint8')
+    return cmap.lut_u8
+
+
+def _palette_index(arr_norm: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """uint8 palette indices for values in [0, 1]; masked cells get index 0."""
+    arr_norm *= PALETTE_LEVELS
+    np.minimum(arr_norm, PALETTE_LEVELS - 1, out=arr_norm)
+    idx = arr_norm.astype('uint8')
+    idx += 1
+    idx[mask] = 0
+    return idx
+
+
+def _stretch_percentiles(arr: np.ma.MaskedArray, qs: Tuple[float, ...]) -> List[float]:
+    """Percentiles of the unmasked values from one histogram, interpolated within the bin."""
+    if arr.count() == 0:
+        return [float('nan')] * len(qs)
+    lo, hi = float(arr.min()), float(arr.max())
+    if hi <= lo:
+        return [lo] * len(qs)
+    width = (hi - lo) / STRETCH_BINS
+    pos = np.subtract(arr.filled(lo), lo, dtype=np.result_type(arr.dtype, np.float32))
+    pos /= width
+    idx = pos.astype(np.intp)
+    np.minimum(idx, STRETCH_BINS - 1, out=idx)
+    idx[np.ma.getmaskarray(arr)] = STRETCH_BINS  # overflow bin, dropped below
+    hist = np.bincount(idx.ravel(), minlength=STRETCH_BINS + 1)[:STRETCH_BINS]
+    cum = np.cumsum(hist)
+    out = []
+    for q in qs:
+        target = q / 100.0 * cum[-1]
+        i = min(int(np.searchsorted(cum, target)), STRETCH_BINS - 1)
+        below = cum[i - 1] if i > 0 else 0
+        frac = (target - below) / hist[i] if hist[i] else 0.5
+        out.append(float(lo + (i + frac) * width))
+    return out
+
+
+def _overlay_cache_key(path: Path, vmin, vmax, cmap, enhance: bool) -> str:
+    st = os.stat(path)
+    parts = [Path(path).resolve(), st.st_mtime_ns, st.st_size, vmin, vmax, getattr(cmap, 'name', cmap),
+             enhance, MAX_OVERLAY_SIDE, PNG_LEVEL, oxipng is not None, OVERLAY_CACHE_VERSION]
+    return hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()
+
+
 def geotiff_to_png_data(path: Path, vmin=None, vmax=None, cmap='viridis', 
                         enhance=True) -> Tuple[str, list]:
-    """Convert GeoTIFF to base64 PNG with optional NASA-style enhancement."""
+    """Convert GeoTIFF to base64 PNG with optional NASA-style enhancement.
+
+    Encoded PNGs are cached in ``OVERLAY_CACHE_DIR`` keyed on the file's mtime/size and
+    the render settings, so re-running with a different title or basemap skips the raster.
+    """
+    key = _overlay_cache_key(path, vmin, vmax, cmap, enhance)
+    png_file = OVERLAY_CACHE_DIR / f'{key}.png'
+    bounds_file = OVERLAY_CACHE_DIR / f'{key}.bounds.json'
+    if png_file.exists() and bounds_file.exists():
+        png, bounds = png_file.read_bytes(), json.loads(bounds_file.read_text())
+    else:
+        png, bounds = _encode_overlay(path, vmin, vmax, cmap, enhance)
+        try:
+            OVERLAY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            png_file.write_bytes(png)
+            bounds_file.write_text(json.dumps(bounds))  # written last: marks the entry complete
+        except OSError:
+            pass  # the cache is best-effort
+    return base64.b64encode(png).decode('utf-8'), bounds
+
+
+def _encode_overlay(path: Path, vmin, vmax, cmap, enhance: bool) -> Tuple[bytes, list]:
+    """Render a GeoTIFF to palette-PNG bytes and its [[south, west], [north, east]] bounds."""
+    # Deferred so CLI runs that render no rasters skip the import cost
+    from matplotlib import colormaps
+    from PIL import Image
+    
     with rio.open(path) as ds:
-        arr = ds.read(1)
+        # Decimated read (served from overviews when present); nodata comes back masked
+        arr = read_decimated(ds, MAX_OVERLAY_SIDE, dtype=None)
         bounds = transform_bounds(ds.crs, 'EPSG:4326', *ds.bounds)
     
-    arr = np.ma.masked_invalid(arr)
-    if hasattr(ds, 'nodata') and ds.nodata is not None:
-        arr = np.ma.masked_where(arr == ds.nodata, arr)
+    if np.issubdtype(arr.dtype, np.floating):  # integer rasters cannot hold NaN/inf
+        arr = np.ma.masked_invalid(arr, copy=False)
     
-    if vmin is None:
-        vmin = float(np.nanpercentile(arr.compressed(), 2))
-    if vmax is None:
-        vmax = float(np.nanpercentile(arr.compressed(), 98))
+    if vmin is None or vmax is None:
+        p2, p98 = _stretch_percentiles(arr, (2, 98))
+        vmin = p2 if vmin is None else vmin
+        vmax = p98 if vmax is None else vmax
     
     if enhance and isinstance(cmap, str):
         path_str = str(path).lower()
@@ -70,30 +198,35 @@ def geotiff_to_png_data(path: Path, vmin=None, vmax=None, cmap='viridis',
         elif 'ratio' in path_str or 'vh_vv' in path_str:
             cmap = create_nasa_colormap('ratio')
         else:
-            cmap = plt.cm.get_cmap(cmap)
+            cmap = colormaps[cmap]
     
-    arr_norm = np.clip((arr - vmin) / (vmax - vmin + 1e-6), 0, 1)
+    mask = np.ma.getmaskarray(arr)
+    arr_norm = (arr.filled(vmin) - vmin) / (vmax - vmin + 1e-6)
+    np.clip(arr_norm, 0, 1, out=arr_norm)
     
-    if hasattr(cmap, '__call__'):
-        rgba = cmap(arr_norm)
-        rgb = (rgba[:, :, :3] * 255).astype('uint8')
-    else:
-        rgb = (arr_norm * 255).astype('uint8')
-        rgb = np.stack([rgb, rgb, rgb], axis=-1)
+    palette = _colormap_lut(cmap) if hasattr(cmap, '__call__') else GRAY_PALETTE
+    img = Image.fromarray(_palette_index(arr_norm, mask))
+    img.putpalette(palette.tobytes())  # L -> P, one byte per pixel
     
     bio = io.BytesIO()
-    Image.fromarray(rgb).save(bio, format='PNG')
-    data = base64.b64encode(bio.getvalue()).decode('utf-8')
+    # With oxipng, write fast and let it do the real compression
+    img.save(bio, format='PNG', compress_level=1 if oxipng is not None else PNG_LEVEL, transparency=0)
+    png = bio.getvalue()
+    if oxipng is not None:
+        png = oxipng.optimize_from_memory(png, level=2, strip=oxipng.StripChunks.all())
     
-    return data, [[bounds[1], bounds[0]], [bounds[3], bounds[2]]]
+    return png, [[bounds[1], bounds[0]], [bounds[3], bounds[2]]]
 
 
-def add_geotiff_layer(m: folium.Map, tif: Path, name: str, opacity: float = 0.7,
-                     vmin=None, vmax=None, cmap='viridis') -> None:
-    """Add GeoTIFF as image overlay with NASA-style rendering."""
+def _render_overlay(tif: Path, vmin=None, vmax=None, cmap='viridis') -> Tuple[str, list]:
+    """Render a GeoTIFF to a PNG data URI and its lat/lon bounds; touches no folium state."""
     data, bounds = geotiff_to_png_data(tif, vmin=vmin, vmax=vmax, cmap=cmap)
+    return 'data:image/png;base64,' + data, bounds
+
+
+def _add_overlay(m: folium.Map, image: str, bounds: list, name: str, opacity: float = 0.7) -> None:
     overlay = folium.raster_layers.ImageOverlay(
-        image='data:image/png;base64,' + data,
+        image=image,
         bounds=bounds,
         name=name,
         opacity=opacity,
@@ -103,34 +236,19 @@ def add_geotiff_layer(m: folium.Map, tif: Path, name: str, opacity: float = 0.7,
     overlay.add_to(m)
 
 
+def add_geotiff_layer(m: folium.Map, tif: Path, name: str, opacity: float = 0.7,
+                     vmin=None, vmax=None, cmap='viridis') -> None:
+    """Add GeoTIFF as image overlay with NASA-style rendering."""
+    image, bounds = _render_overlay(tif, vmin=vmin, vmax=vmax, cmap=cmap)
+    _add_overlay(m, image, bounds, name, opacity=opacity)
+
+
 def add_eruption_markers(m: folium.Map) -> None:
     """Add markers for known eruption locations with timeline info."""
+    group = folium.FeatureGroup(name='Eruptions')
     for eruption in ERUPTIONS:
-        # Create popup content
-        popup_html = f"""
-        <div style="font-family: 'Courier New', monospace; min-width: 200px;">
-            <h4 style="color: #ff6600; margin: 5px 0; border-bottom: 2px solid #ff6600;">
-                ERUPTION EVENT
-            </h4>
-            <table style="width: 100%; font-size: 12px;">
-                <tr>
-                    <td style="color: #666;"><strong>Date:</strong></td>
-                    <td>{eruption['date']}</td>
-                </tr>
-                <tr>
-                    <td style="color: #666;"><strong>Location:</strong></td>
-                    <td>{eruption['name']}</td>
-                </tr>
-                <tr>
-                    <td style="color: #666;"><strong>Volume:</strong></td>
-                    <td>{eruption['volume']}</td>
-                </tr>
-            </table>
-            <p style="font-size: 10px; color: #999; margin-top: 10px;">
-                Source: Icelandic Met Office
-            </p>
-        </div>
-        """
+        popup_html = _POPUP_TPL.substitute(date=eruption['date'], name=eruption['name'],
+                                           volume=eruption['volume'])
         
         # Add large, bright marker
         folium.CircleMarker(
@@ -143,7 +261,8 @@ def add_eruption_markers(m: folium.Map) -> None:
             fillColor='#ff0000',
             fillOpacity=0.9,
             weight=3
-        ).add_to(m)
+        ).add_to(group)
+    group.add_to(m)
 
 
 def add_timeline_panel(m: folium.Map) -> None:
@@ -315,99 +434,105 @@ def main(mode: str, layers: List[str], out: str, zoom: int,
          basemap: str, title: str, vmin: float, vmax: float, add_eruptions: bool) -> None:
     """Create NASA-style interactive SAR maps with eruption markers and timeline."""
     
-    print(f"🛰️  Creating {mode} mode map with NASA styling...")
+    with rio.Env(**OVERLAY_GDAL_ENV):
+        print(f"🛰️  Creating {mode} mode map with NASA styling...")
     
-    if mode == 'single':
-        m = folium.Map(
-            location=MAP_CENTER, 
-            zoom_start=zoom, 
-            tiles=basemap,
-            control_scale=True
-        )
+        if mode == 'single':
+            m = folium.Map(
+                location=MAP_CENTER, 
+                zoom_start=zoom, 
+                tiles=basemap,
+                control_scale=True
+            )
         
-        if not layers:
-            folium.Marker(MAP_CENTER, tooltip='No layers provided').add_to(m)
-            print("⚠️  No layers provided, creating empty map")
-        else:
-            for i, p in enumerate(layers):
-                layer_path = Path(p)
-                layer_name = layer_path.stem.replace('_', ' ').title()
+            if not layers:
+                folium.Marker(MAP_CENTER, tooltip='No layers provided').add_to(m)
+                print("⚠️  No layers provided, creating empty map")
+            else:
+                for i, p in enumerate(layers):
+                    layer_path = Path(p)
+                    layer_name = layer_path.stem.replace('_', ' ').title()
                 
-                if 'change' in str(p).lower() or 'delta' in str(p).lower():
-                    cmap = create_nasa_colormap('change')
-                    default_vmin = vmin if vmin is not None else -3
-                    default_vmax = vmax if vmax is not None else 3
-                elif 'ratio' in str(p).lower():
-                    cmap = create_nasa_colormap('ratio')
-                    default_vmin = vmin if vmin is not None else -25
-                    default_vmax = vmax if vmax is not None else -5
-                else:
-                    cmap = 'viridis'
-                    default_vmin = vmin
-                    default_vmax = vmax
+                    if 'change' in str(p).lower() or 'delta' in str(p).lower():
+                        cmap = create_nasa_colormap('change')
+                        default_vmin = vmin if vmin is not None else -3
+                        default_vmax = vmax if vmax is not None else 3
+                    elif 'ratio' in str(p).lower():
+                        cmap = create_nasa_colormap('ratio')
+                        default_vmin = vmin if vmin is not None else -25
+                        default_vmax = vmax if vmax is not None else -5
+                    else:
+                        cmap = 'viridis'
+                        default_vmin = vmin
+                        default_vmax = vmax
                 
-                add_geotiff_layer(m, layer_path, layer_name, opacity=0.7,
-                                vmin=default_vmin, vmax=default_vmax, cmap=cmap)
-                print(f"  ✓ Added layer: {layer_name}")
+                    add_geotiff_layer(m, layer_path, layer_name, opacity=0.7,
+                                    vmin=default_vmin, vmax=default_vmax, cmap=cmap)
+                    print(f"  ✓ Added layer: {layer_name}")
+        
+            # Add eruption markers and timeline
+            if add_eruptions:
+                add_eruption_markers(m)
+                add_timeline_panel(m)
+                print("  ✓ Added eruption markers and timeline")
         
-        # Add eruption markers and timeline
-        if add_eruptions:
-            add_eruption_markers(m)
-            add_timeline_panel(m)
-            print("  ✓ Added eruption markers and timeline")
+            # Add NASA styling and controls
+            add_nasa_styling(m, title)
+            add_coordinate_display(m)
+            Fullscreen(position='topright').add_to(m)
+            MiniMap(toggle_display=True, position='topright').add_to(m)
+            folium.LayerControl(position='topright', collapsed=False).add_to(m)
         
-        # Add NASA styling and controls
-        add_nasa_styling(m, title)
-        add_coordinate_display(m)
-        Fullscreen(position='topright').add_to(m)
-        MiniMap(toggle_display=True, position='topright').add_to(m)
-        folium.LayerControl(position='topright', collapsed=False).add_to(m)
+            Path(out).parent.mkdir(parents=True, exist_ok=True)
+            m.save(out)
+            print(f'✅ Saved map to {out}')
         
-        Path(out).parent.mkdir(parents=True, exist_ok=True)
-        m.save(out)
-        print(f'✅ Saved map to {out}')
+        else:  # dual mode
+            if len(layers) != 2:
+                raise click.UsageError('Dual mode requires exactly two layers')
         
-    else:  # dual mode
-        if len(layers) != 2:
-            raise click.UsageError('Dual mode requires exactly two layers')
+            dm = DualMap(
+                location=MAP_CENTER, 
+                zoom_start=zoom,
+                tiles_layer1=basemap,
+                tiles_layer2=basemap
+            )
         
-        dm = DualMap(
-            location=MAP_CENTER, 
-            zoom_start=zoom,
-            tiles_layer1=basemap,
-            tiles_layer2=basemap
-        )
+            left_path = Path(layers[0])
+            left_name = left_path.stem.replace('_', ' ').title()
+            right_path = Path(layers[1])
+            right_name = right_path.stem.replace('_', ' ').title()
         
-        left_path = Path(layers[0])
-        left_name = left_path.stem.replace('_', ' ').title()
-        add_geotiff_layer(dm.m1, left_path, left_name, 
-                         vmin=vmin or -25, vmax=vmax or -5,
-                         cmap=create_nasa_colormap('ratio'))
+            # Render both panels concurrently (I/O and PNG encoding release the GIL);
+            # folium objects are only touched from this thread
+            def render(p: Path) -> Tuple[str, list]:
+                with rio.Env(**OVERLAY_GDAL_ENV):  # rasterio environments are per thread
+                    return _render_overlay(p, vmin=vmin or -25, vmax=vmax or -5,
+                                           cmap=create_nasa_colormap('ratio'))
         
-        right_path = Path(layers[1])
-        right_name = right_path.stem.replace('_', ' ').title()
-        add_geotiff_layer(dm.m2, right_path, right_name,
-                         vmin=vmin or -25, vmax=vmax or -5,
-                         cmap=create_nasa_colormap('ratio'))
+            with ThreadPoolExecutor(max_workers=2) as ex:
+                left, right = ex.map(render, [left_path, right_path])
+            _add_overlay(dm.m1, *left, left_name)
+            _add_overlay(dm.m2, *right, right_name)
         
-        # Add eruption markers to both maps
-        if add_eruptions:
-            add_eruption_markers(dm.m1)
-            add_eruption_markers(dm.m2)
-            add_timeline_panel(dm.m1)
-            print("  ✓ Added eruption markers to both panels")
+            # Add eruption markers to both maps
+            if add_eruptions:
+                add_eruption_markers(dm.m1)
+                add_eruption_markers(dm.m2)
+                add_timeline_panel(dm.m1)
+                print("  ✓ Added eruption markers to both panels")
         
-        for m in [dm.m1, dm.m2]:
-            Fullscreen(position='topright').add_to(m)
-            folium.LayerControl(position='topright').add_to(m)
+            for m in [dm.m1, dm.m2]:
+                Fullscreen(position='topright').add_to(m)
+                folium.LayerControl(position='topright').add_to(m)
         
-        add_nasa_styling(dm.m1, f"{title} - Comparison View")
+            add_nasa_styling(dm.m1, f"{title} - Comparison View")
         
-        Path(out).parent.mkdir(parents=True, exist_ok=True)
-        dm.save(out)
-        print(f'✅ Saved dual map to {out}')
-        print(f'   Left: {left_name}')
-        print(f'   Right: {right_name}')
+            Path(out).parent.mkdir(parents=True, exist_ok=True)
+            dm.save(out)
+            print(f'✅ Saved dual map to {out}')
+            print(f'   Left: {left_name}')
+            print(f'   Right: {right_name}')
 
 
 if __name__ == '__main__':
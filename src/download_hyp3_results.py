@@ -5,24 +5,31 @@ Usage:
   python src/download_hyp3_results.py
 
 - Reads job metadata from data/hyp3_jobs.json if present; otherwise queries HyP3 by name pattern.
-- Downloads to data/rtc/ and extracts ZIPs.
+- Downloads to data/rtc/ (up to --workers jobs at once) and extracts ZIPs.
 - Organizes by period (pre/during/recent) using job names.
 - Creates data/rtc/manifest.csv with filename, date, polarization, period.
 """
 from __future__ import annotations
-import csv
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import json
+import os
 import re
 import sys
 import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 import zipfile
 
+import click
+import numpy as np
+import pandas as pd
 from hyp3_sdk import HyP3
 
 from config import OUTPUT_DIRS
 
+# Acquisition date anywhere in an RTC product path
+_DATE_RE = re.compile(r'(20\d{2}-\d{2}-\d{2})')
+
 
 def read_jobs_meta(path: Path) -> List[Dict]:
     if not path.exists():
@@ -39,6 +46,11 @@ def safe_extract(zip_path: Path, out_dir: Path) -> None:
         z.extractall(out_dir)
 
 
+def _extract_zip(zip_path: str, out_dir: str) -> None:
+    """Process-pool entry point: plain-string arguments so it pickles cheaply."""
+    safe_extract(Path(zip_path), Path(out_dir))
+
+
 def guess_period_from_name(name: str) -> str:
     for p in ('pre', 'during', 'recent'):
         if f"_{p}_" in name:
@@ -46,24 +58,28 @@ def guess_period_from_name(name: str) -> str:
     return 'unknown'
 
 
-def build_manifest(rtc_dir: Path, manifest_path: Path) -> None:
-    rows = []
+def _iter_rows(rtc_dir: Path) -> Iterator[Tuple[str, str, str]]:
+    """(filename, upper-case stem, parent folder name) per tif, walked lazily."""
     for tif in rtc_dir.rglob('*.tif'):
-        # Expect filenames like *_VV.tif or *_VH.tif
-        pol = 'VV' if '_VV' in tif.stem.upper() else ('VH' if '_VH' in tif.stem.upper() else '')
-        # date guess from path or name
-        m = re.search(r'(20\d{2}-\d{2}-\d{2})', tif.as_posix())
-        date_str = m.group(1) if m else ''
-        period = tif.parent.name if tif.parent.name in ('pre','during','recent') else 'unknown'
-        rows.append({'filename': str(tif), 'date': date_str, 'polarization': pol, 'period': period})
+        yield str(tif), tif.stem.upper(), tif.parent.name
+
+
+def build_manifest(rtc_dir: Path, manifest_path: Path) -> None:
+    df = pd.DataFrame.from_records(_iter_rows(rtc_dir), columns=['filename', 'stem', 'parent']).astype(object)
+
+    # Expect filenames like *_VV.tif or *_VH.tif
+    df['date'] = df['filename'].str.extract(_DATE_RE, expand=False).fillna('')
+    df['polarization'] = np.where(df['stem'].str.contains('_VV', regex=False), 'VV',
+                                  np.where(df['stem'].str.contains('_VH', regex=False), 'VH', ''))
+    df['period'] = df['parent'].where(df['parent'].isin(['pre','during','recent']), 'unknown')
 
-    with manifest_path.open('w', newline='') as f:
-        w = csv.DictWriter(f, fieldnames=['filename','date','polarization','period'])
-        w.writeheader()
-        w.writerows(rows)
+    df.to_csv(manifest_path, columns=['filename','date','polarization','period'], index=False)
 
 
-def main() -> None:
+@click.command()
+@click.option('--workers', type=int, default=8, show_default=True,
+              help='Concurrent HyP3 downloads')
+def main(workers: int) -> None:
     data_dir = Path(OUTPUT_DIRS['raw']).parent
     rtc_dir = Path(OUTPUT_DIRS['rtc'])
     rtc_dir.mkdir(parents=True, exist_ok=True)
@@ -101,23 +117,33 @@ def main() -> None:
         print('No completed jobs yet. Try again later.')
         return
 
-    for job in completed:
-        try:
-            # Download to rtc_dir root
-            job.download_files(rtc_dir)
-        except Exception as e:
-            print(f"Download failed for {getattr(job, 'name', 'job')}: {e}", file=sys.stderr)
-
-    # Extract ZIPs and organize by period
-    for z in rtc_dir.glob('*.zip'):
-        period = guess_period_from_name(z.stem)
-        target = rtc_dir / period
-        target.mkdir(exist_ok=True)
-        try:
-            safe_extract(z, target)
-            z.unlink(missing_ok=True)
-        except Exception as e:
-            print(f"Extract failed {z.name}: {e}", file=sys.stderr)
+    # Download to rtc_dir root; network-bound, so overlap several jobs
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(completed)))) as ex:
+        futures = {ex.submit(job.download_files, rtc_dir): job for job in completed}
+        for fut in as_completed(futures):
+            try:
+                fut.result()
+            except Exception as e:
+                print(f"Download failed for {getattr(futures[fut], 'name', 'job')}: {e}", file=sys.stderr)
+
+    # Extract ZIPs and organize by period; decompression is CPU-bound, one process per ZIP
+    zips = list(rtc_dir.glob('*.zip'))
+    extracted = []
+    if zips:
+        with ProcessPoolExecutor(max_workers=min(len(zips), os.cpu_count() or 1)) as ex:
+            futures = {}
+            for z in zips:
+                target = rtc_dir / guess_period_from_name(z.stem)
+                target.mkdir(exist_ok=True)
+                futures[ex.submit(_extract_zip, str(z), str(target))] = z
+            for fut in as_completed(futures):
+                try:
+                    fut.result()
+                    extracted.append(futures[fut])
+                except Exception as e:
+                    print(f"Extract failed {futures[fut].name}: {e}", file=sys.stderr)
+    for z in extracted:
+        z.unlink(missing_ok=True)
 
     # Build manifest
     manifest_path = rtc_dir / 'manifest.csv'
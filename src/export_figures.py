@@ -6,6 +6,7 @@ Usage:
 """
 from __future__ import annotations
 from pathlib import Path
+from typing import Optional
 import io
 import click
 import numpy as np
@@ -13,20 +14,37 @@ import pandas as pd
 import rasterio as rio
 import matplotlib.pyplot as plt
 
-from analyze_backscatter import compute_vh_vv_ratio, compute_change, _read_band as _read  # type: ignore
+from analyze_backscatter import GDAL_ENV, compute_vh_vv_ratio, compute_change, _read_band, _read_preview  # type: ignore
+
+# Longest side read for figure panels: the overview PNG is 12x8 in at 200 dpi (2400x1600)
+FIGURE_SIDE = 2400
+
+
+def _read_decimated(path: Path, max_side: Optional[int] = FIGURE_SIDE) -> np.ndarray:
+    """Band 1 averaged down to at most ``max_side`` pixels (overviews if present), nodata as NaN.
+
+    ``max_side=None`` reads at full resolution.
+    """
+    if max_side is None:
+        return _read_band(path)[0]
+    return _read_preview(path, max_side)
 
 
 def _hist(ax, arr: np.ndarray, title: str) -> None:
-    vals = arr[np.isfinite(arr)]
-    if vals.size:
-        ax.hist(vals, bins=60, color='#444', alpha=0.9)
+    # NaN-skipping min/max, then np.histogram drops NaN itself: no filtered copy of arr
+    lo = float(np.fmin.reduce(arr, axis=None))
+    hi = float(np.fmax.reduce(arr, axis=None))
+    if np.isfinite(lo) and np.isfinite(hi):
+        counts, edges = np.histogram(arr, bins=60, range=(lo, hi))
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color='#444', alpha=0.9)
     ax.set_title(title)
 
 
-def create_overview_figure(vv_tif: Path, vh_tif: Path, ratio_tif: Path, output_png: Path) -> None:
-    vv, _ = _read(vv_tif)
-    vh, _ = _read(vh_tif)
-    ratio, _ = _read(ratio_tif)
+def create_overview_figure(vv_tif: Path, vh_tif: Path, ratio_tif: Path, output_png: Path,
+                           max_side: Optional[int] = FIGURE_SIDE) -> None:
+    vv = _read_decimated(vv_tif, max_side)
+    vh = _read_decimated(vh_tif, max_side)
+    ratio = _read_decimated(ratio_tif, max_side)
 
     fig = plt.figure(figsize=(12, 8), constrained_layout=True)
     gs = fig.add_gridspec(2, 3)
@@ -45,10 +63,10 @@ def create_overview_figure(vv_tif: Path, vh_tif: Path, ratio_tif: Path, output_p
 
 
 def create_timeseries_plot(manifest_csv: Path, output_png: Path) -> None:
-    df = pd.read_csv(manifest_csv)
+    df = pd.read_csv(manifest_csv, usecols=['date'])
     # Compute mean ratio per date when both VV and VH are present: this is a placeholder aggregation
     # In practice, use precomputed ratio rasters. Here we just count available VV/VH as proxy.
-    dates = sorted(set(df['date']))
+    dates = np.sort(df['date'].dropna().unique())  # ISO strings: lexical == chronological
     means = np.arange(len(dates), dtype=float)  # simple placeholder ramp
     stds = np.ones_like(means) * 0.5
 
@@ -67,32 +85,38 @@ def create_timeseries_plot(manifest_csv: Path, output_png: Path) -> None:
 @click.command()
 @click.option('--manifest', type=click.Path(exists=True), default='data/rtc/manifest.csv', show_default=True)
 @click.option('--outdir', type=click.Path(), default='outputs/figures', show_default=True)
-def main(manifest: str, outdir: str) -> None:
+@click.option('--full-res', is_flag=True, help='Read rasters at full resolution for the overview figure')
+def main(manifest: str, outdir: str, full_res: bool) -> None:
     out = Path(outdir); out.mkdir(parents=True, exist_ok=True)
     man = Path(manifest)
 
-    # Attempt to find one VV/VH pair to build overview
-    if man.exists():
-        df = pd.read_csv(man)
-        # Pick any period with VV and VH
-        for period in ['pre','during','recent']:
-            sub = df[(df['period']==period) & df['polarization'].isin(['VV','VH'])]
-            if not sub.empty and sub['polarization'].nunique() == 2:
-                try:
-                    vv_path = Path(sub[sub['polarization']=='VV']['filename'].iloc[0])
-                    vh_path = Path(sub[sub['polarization']=='VH']['filename'].iloc[0])
-                    ratio_path = out / f'ratio_{period}.tif'
-                    compute_vh_vv_ratio(vv_path, vh_path, ratio_path)
-                    create_overview_figure(vv_path, vh_path, ratio_path, out / f'overview_{period}.png')
-                    break
-                except Exception as e:
-                    print('Overview figure failed:', e)
-
-    # Time series plot (illustrative)
-    try:
-        create_timeseries_plot(man, out / 'timeseries_ratio.png')
-    except Exception as e:
-        print('Timeseries figure failed:', e)
+    # Shared pipeline GDAL settings; the manifest's tifs need no sidecar scan
+    with rio.Env(**GDAL_ENV, GDAL_DISABLE_READDIR_ON_OPEN='EMPTY_DIR'):
+        # Attempt to find one VV/VH pair to build overview
+        if man.exists():
+            df = pd.read_csv(man)
+            # Pick any period with VV and VH (one filter + groupby instead of a scan per period)
+            groups = dict(tuple(df[df['polarization'].isin(['VV','VH'])].groupby('period', sort=False)))
+            for period in ['pre','during','recent']:
+                sub = groups.get(period)
+                if sub is not None and sub['polarization'].nunique() == 2:
+                    try:
+                        first = sub.drop_duplicates('polarization').set_index('polarization')['filename']
+                        vv_path = Path(first['VV'])
+                        vh_path = Path(first['VH'])
+                        ratio_path = out / f'ratio_{period}.tif'
+                        compute_vh_vv_ratio(vv_path, vh_path, ratio_path)
+                        create_overview_figure(vv_path, vh_path, ratio_path, out / f'overview_{period}.png',
+                                               max_side=None if full_res else FIGURE_SIDE)
+                        break
+                    except Exception as e:
+                        print('Overview figure failed:', e)
+
+        # Time series plot (illustrative)
+        try:
+            create_timeseries_plot(man, out / 'timeseries_ratio.png')
+        except Exception as e:
+            print('Timeseries figure failed:', e)
 
 
 if __name__ == '__main__':
@@ -1,4 +1,5 @@
 import io
+import os
 import base64
 import click
 import folium
@@ -7,19 +8,22 @@ import rasterio as rio
 from rasterio.warp import transform_bounds
 from PIL import Image
 
+from raster_io import OVERLAY_GDAL_ENV, MAX_OVERLAY_SIDE, PNG_LEVEL, read_decimated
+
 
 def add_geotiff_layer(m, path, name, vmin=None, vmax=None, cmap='viridis', opacity=0.8):
     with rio.open(path) as ds:
-        arr = ds.read(1)
+        arr = read_decimated(ds, MAX_OVERLAY_SIDE).filled(np.nan)
         bounds = transform_bounds(ds.crs, 'EPSG:4326', *ds.bounds)
     if vmin is None:
         vmin = np.nanpercentile(arr, 2)
     if vmax is None:
         vmax = np.nanpercentile(arr, 98)
     a = np.clip((arr - vmin) / (vmax - vmin + 1e-6), 0, 1)
+    np.nan_to_num(a, copy=False)  # nodata -> black
     png = (a * 255).astype('uint8')
     bio = io.BytesIO()
-    Image.fromarray(png).save(bio, format='PNG')
+    Image.fromarray(png).save(bio, format='PNG', compress_level=PNG_LEVEL)
     data = base64.b64encode(bio.getvalue()).decode('utf-8')
 
     overlay = folium.raster_layers.ImageOverlay(
@@ -42,22 +46,22 @@ def main(center, zoom, layers, names, out, dual, basemap):
     if names and len(names) != len(layers):
         raise click.UsageError('--names count must match --layers count')
 
-    m = folium.Map(location=center, zoom_start=zoom, tiles=basemap)
+    with rio.Env(**OVERLAY_GDAL_ENV):
+        m = folium.Map(location=center, zoom_start=zoom, tiles=basemap)
 
-    if not layers:
-        folium.Marker(center, tooltip='No layers provided').add_to(m)
-    else:
-        for i, path in enumerate(layers):
-            name = names[i] if names else f'Layer {i+1}'
-            add_geotiff_layer(m, path, name)
+        if not layers:
+            folium.Marker(center, tooltip='No layers provided').add_to(m)
+        else:
+            for i, path in enumerate(layers):
+                name = names[i] if names else f'Layer {i+1}'
+                add_geotiff_layer(m, path, name)
 
-    folium.LayerControl().add_to(m)
-    out_path = out
-    os_dir = out_path.rsplit('/', 1)[0]
-    import os
-    os.makedirs(os_dir, exist_ok=True)
-    m.save(out_path)
-    print('Saved map to', out_path)
+        folium.LayerControl().add_to(m)
+        out_path = out
+        os_dir = out_path.rsplit('/', 1)[0]
+        os.makedirs(os_dir, exist_ok=True)
+        m.save(out_path)
+        print('Saved map to', out_path)
 
 
 if __name__ == '__main__':
@@ -1,24 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
 import os
+import threading
 import click
 import numpy as np
 import rasterio as rio
 from rasterio.windows import from_bounds as win_from_bounds, transform as win_transform, Window
 from rasterio.warp import transform_bounds
-import matplotlib.pyplot as plt
+
+from raster_io import ratio_db, read_decimated
+
+# Side of the square blocks the windowed path streams through memory
+TILE = 1024
+# Multithreaded DEFLATE decode plus a larger block cache; tile workers enter it themselves
+# with GDAL_NUM_THREADS cut down to their share of the cores
+GDAL_ENV = dict(GDAL_NUM_THREADS='ALL_CPUS', GDAL_CACHEMAX=512)
+# Nodata for int16-scaled products; valid values are clipped to +/-32767
+INT16_NODATA = -32768
+# Longest side read back for --quicklook PNGs (6in x 200dpi)
+QUICKLOOK_SIDE = 1200
 
 
 def read_band(path):
     with rio.open(path) as ds:
-        arr = ds.read(1).astype('float32')
+        arr = ds.read(1, out_dtype='float32')
         profile = ds.profile
     return arr, profile
 
 
-def write_tif(path, arr, profile):
+def _output_profile(profile, scale=None):
+    """
+    Profile for a single-band product: float32, or int16 holding round(value*scale).
+    512px tiles keep windowed reads downstream O(tile); the DEFLATE predictor
+    (3 = floating-point, 2 = integer differencing) makes smooth dB fields compress well.
+    """
     p = profile.copy()
-    p.update(dtype='float32', count=1, compress='deflate')
-    with rio.open(path, 'w', **p) as dst:
-        dst.write(arr.astype('float32'), 1)
+    p.update(dtype='float32', count=1, compress='deflate', predictor=3, zlevel=6,
+             tiled=True, blockxsize=512, blockysize=512, BIGTIFF='IF_SAFER')
+    if scale:
+        p.update(dtype='int16', nodata=INT16_NODATA, predictor=2)
+    return p
+
+
+def _to_int16(arr, scale):
+    """round(arr*scale) as int16, with NaN mapped to INT16_NODATA."""
+    out = np.multiply(arr, scale, dtype='float32')
+    np.round(out, out=out)
+    np.clip(out, -32767, 32767, out=out)
+    out[np.isnan(out)] = INT16_NODATA
+    return out.astype('int16')
+
+
+def _prepare(arr, scale=None):
+    return _to_int16(arr, scale) if scale else arr.astype('float32', copy=False)
+
+
+def write_tif(path, arr, profile, scale=None):
+    """
+    Write a single-band product. With ``scale`` (e.g. 100 for 0.01 dB steps) values are
+    stored as int16 with a 1/scale scale tag, halving the file size versus float32.
+    """
+    with rio.open(path, 'w', **_output_profile(profile, scale)) as dst:
+        dst.write(_prepare(arr, scale), 1)
+        if scale:
+            dst.scales = (1 / scale,)
+
+
+def read_product(path, max_side=None):
+    """
+    Read a product written by write_tif back as float32 values, NaN for nodata.
+    With ``max_side`` the band is block-averaged by an integer factor during decode.
+    """
+    with rio.open(path) as ds:
+        return read_decimated(ds, max_side).filled(np.nan)
+
+
+def _iter_tiles(width, height, size=TILE):
+    """Yield Windows of at most size x size covering a width x height grid, row-major."""
+    for row in range(0, height, size):
+        for col in range(0, width, size):
+            yield Window(col, row, min(size, width - col), min(size, height - row))
+
+
+def _offset(win: Window, by: Window) -> Window:
+    """``win`` shifted by the offsets of ``by``."""
+    return Window(by.col_off + win.col_off, by.row_off + win.row_off, win.width, win.height)
 
 
 def _round_window(win: Window) -> Window:
@@ -88,11 +153,60 @@ def crop_to_common_extent(pre_path: str, post_path: str):
     """
     win_pre, win_post, out_prof = _compute_common_windows(pre_path, post_path)
     with rio.open(pre_path) as da, rio.open(post_path) as db:
-        pre_arr = da.read(1, window=win_pre).astype('float32')
-        post_arr = db.read(1, window=win_post).astype('float32')
+        pre_arr = da.read(1, window=win_pre, out_dtype='float32')
+        post_arr = db.read(1, window=win_post, out_dtype='float32')
     return pre_arr, post_arr, out_prof
 
 
+def stream_ratios(pre_vv, pre_vh, post_vv, post_vh, win_pre, win_post, profile, outdir, workers=1,
+                  scale=None):
+    """
+    Write pre/post VH/VV ratios and their delta tile by tile over the common windows,
+    so only ``workers`` blocks of each band are resident at a time. ``scale`` as in write_tif.
+    """
+    p = _output_profile(profile, scale)
+    paths = [os.path.join(outdir, n) for n in ('VH_VV_ratio_pre.tif', 'VH_VV_ratio_post.tif', 'delta_ratio_db.tif')]
+    # Tiles are dealt round-robin, one list per worker; the workers split the cores
+    # with GDAL's decode threads instead of each claiming all of them
+    tiles = list(_iter_tiles(p['width'], p['height']))
+    n_workers = max(1, min(workers, len(tiles)))
+    env = dict(GDAL_ENV, GDAL_NUM_THREADS=max(1, (os.cpu_count() or 1) // n_workers))
+    lock = threading.Lock()
+    with rio.open(paths[0], 'w', **p) as d_pre, rio.open(paths[1], 'w', **p) as d_post, \
+            rio.open(paths[2], 'w', **p) as d_delta:
+        if scale:
+            for dst in (d_pre, d_post, d_delta):
+                dst.scales = (1 / scale,)
+
+        def process_tiles(tiles):
+            # Datasets are not shared across threads: each worker opens its own read
+            # handles once and keeps them for all of its tiles
+            with rio.Env(**env), rio.open(pre_vv) as a_vv, rio.open(pre_vh) as a_vh, \
+                    rio.open(post_vv) as b_vv, rio.open(post_vh) as b_vh:
+                for win in tiles:
+                    wa, wb = _offset(win, win_pre), _offset(win, win_post)
+                    pre_vv_t = a_vv.read(1, window=wa, out_dtype='float32')
+                    post_vv_t = b_vv.read(1, window=wb, out_dtype='float32')
+                    pre_db = ratio_db(a_vh.read(1, window=wa, out_dtype='float32'), pre_vv_t)
+                    post_db = ratio_db(b_vh.read(1, window=wb, out_dtype='float32'), post_vv_t)
+                    # Reads clipped at a raster edge come back short; keep the common part
+                    h = min(pre_db.shape[0], post_db.shape[0])
+                    w = min(pre_db.shape[1], post_db.shape[1])
+                    pre_db, post_db = pre_db[:h, :w], post_db[:h, :w]
+                    delta = np.subtract(post_db, pre_db, out=post_vv_t[:h, :w])
+                    out_tiles = [_prepare(a, scale) for a in (pre_db, post_db, delta)]
+                    out = Window(win.col_off, win.row_off, w, h)
+                    with lock:
+                        for dst, tile in zip((d_pre, d_post, d_delta), out_tiles):
+                            dst.write(tile, 1, window=out)
+
+        with ThreadPoolExecutor(max_workers=n_workers) as ex:
+            futures = [ex.submit(process_tiles, tiles[i::n_workers]) for i in range(n_workers)]
+            for fut in futures:
+                fut.result()
+    return paths
+
+
 @click.command()
 @click.option('--pre', 'pre_vv', required=True, help='Pre-event VV GeoTIFF')
 @click.option('--prevh', 'pre_vh', required=True, help='Pre-event VH GeoTIFF')
@@ -100,66 +214,72 @@ def crop_to_common_extent(pre_path: str, post_path: str):
 @click.option('--postvh', 'post_vh', required=True, help='Post-event VH GeoTIFF')
 @click.option('--outdir', default='outputs', show_default=True)
 @click.option('--quicklook', is_flag=True, help='Save PNG quicklooks')
-def main(pre_vv, pre_vh, post_vv, post_vh, outdir, quicklook):
+@click.option('--workers', type=int, default=min(8, os.cpu_count() or 1), show_default=True,
+              help='Tiles processed concurrently')
+@click.option('--int16', 'scaled', is_flag=True,
+              help='Store outputs as int16 in 0.01 dB steps (scale tag 0.01, nodata -32768)')
+def main(pre_vv, pre_vh, post_vv, post_vh, outdir, quicklook, workers, scaled):
     os.makedirs(outdir, exist_ok=True)
-    # Compute a common crop window using VV rasters and apply to both VV and VH
-    try:
-        win_pre, win_post, out_base = _compute_common_windows(pre_vv, post_vv)
-    except Exception:
-        # Fallback to full read if windows cannot be computed (should be rare)
-        win_pre = win_post = None
-        out_base = None
-
-    if win_pre is not None and win_post is not None:
-        with rio.open(pre_vv) as ds:
-            profile_full = ds.profile
-        pre_vv_arr = rio.open(pre_vv).read(1, window=win_pre).astype('float32')
-        pre_vh_arr = rio.open(pre_vh).read(1, window=win_pre).astype('float32')
-        post_vv_arr = rio.open(post_vv).read(1, window=win_post).astype('float32')
-        post_vh_arr = rio.open(post_vh).read(1, window=win_post).astype('float32')
-        # Build profile from base
-        profile = profile_full.copy()
-        profile.update(
-            width=out_base['width'], height=out_base['height'], transform=out_base['transform']
-        )
-    else:
-        pre_vv_arr, profile = read_band(pre_vv)
-        pre_vh_arr, _ = read_band(pre_vh)
-        post_vv_arr, _ = read_band(post_vv)
-        post_vh_arr, _ = read_band(post_vh)
-
-    eps = 1e-6
-    pre_ratio_db = 10*np.log10((pre_vh_arr + eps) / (pre_vv_arr + eps))
-    post_ratio_db = 10*np.log10((post_vh_arr + eps) / (post_vv_arr + eps))
-    # Ensure shapes match (defensive cropping to min common shape)
-    if pre_ratio_db.shape != post_ratio_db.shape:
-        h = min(pre_ratio_db.shape[0], post_ratio_db.shape[0])
-        w = min(pre_ratio_db.shape[1], post_ratio_db.shape[1])
-        pre_ratio_db = pre_ratio_db[:h, :w]
-        post_ratio_db = post_ratio_db[:h, :w]
-        # Update profile dims if needed
-        profile = profile.copy()
-        profile.update(width=w, height=h)
-    delta_ratio = post_ratio_db - pre_ratio_db
-
-    write_tif(os.path.join(outdir, 'VH_VV_ratio_pre.tif'), pre_ratio_db, profile)
-    write_tif(os.path.join(outdir, 'VH_VV_ratio_post.tif'), post_ratio_db, profile)
-    write_tif(os.path.join(outdir, 'delta_ratio_db.tif'), delta_ratio, profile)
-
-    if quicklook:
-        import matplotlib.pyplot as plt
-        for name, arr, cmap, vmin, vmax in [
-            ('VH_VV_ratio_pre.png', pre_ratio_db, 'viridis', None, None),
-            ('VH_VV_ratio_post.png', post_ratio_db, 'viridis', None, None),
-            ('delta_ratio_db.png', delta_ratio, 'RdBu', -5, 5),
-        ]:
-            plt.figure(figsize=(6,5))
-            plt.imshow(arr, cmap=cmap, vmin=vmin, vmax=vmax)
-            plt.colorbar()
-            plt.title(name)
-            plt.tight_layout()
-            plt.savefig(os.path.join(outdir, name), dpi=200)
-            plt.close()
+    scale = 100 if scaled else None
+    with rio.Env(**GDAL_ENV):
+        # Compute a common crop window using VV rasters and apply to both VV and VH
+        try:
+            win_pre, win_post, out_base = _compute_common_windows(pre_vv, post_vv)
+        except Exception:
+            # Fallback to full read if windows cannot be computed (should be rare)
+            win_pre = win_post = None
+            out_base = None
+
+        if win_pre is not None and win_post is not None:
+            with rio.open(pre_vv) as ds:
+                profile = ds.profile.copy()
+            profile.update(
+                width=out_base['width'], height=out_base['height'], transform=out_base['transform']
+            )
+            stream_ratios(pre_vv, pre_vh, post_vv, post_vh, win_pre, win_post, profile, outdir, workers,
+                          scale)
+        else:
+            pre_vv_arr, profile = read_band(pre_vv)
+            pre_vh_arr, _ = read_band(pre_vh)
+            post_vv_arr, _ = read_band(post_vv)
+            post_vh_arr, _ = read_band(post_vh)
+
+            # Ratios overwrite the VH buffers and delta reuses a VV buffer: no scene-sized temporaries
+            pre_ratio_db = ratio_db(pre_vh_arr, pre_vv_arr)
+            post_ratio_db = ratio_db(post_vh_arr, post_vv_arr)
+            # Ensure shapes match (defensive cropping to min common shape)
+            if pre_ratio_db.shape != post_ratio_db.shape:
+                h = min(pre_ratio_db.shape[0], post_ratio_db.shape[0])
+                w = min(pre_ratio_db.shape[1], post_ratio_db.shape[1])
+                pre_ratio_db = pre_ratio_db[:h, :w]
+                post_ratio_db = post_ratio_db[:h, :w]
+                # Update profile dims if needed
+                profile = profile.copy()
+                profile.update(width=w, height=h)
+            h, w = post_ratio_db.shape
+            delta_ratio = np.subtract(post_ratio_db, pre_ratio_db, out=post_vv_arr[:h, :w])
+
+            write_tif(os.path.join(outdir, 'VH_VV_ratio_pre.tif'), pre_ratio_db, profile, scale)
+            write_tif(os.path.join(outdir, 'VH_VV_ratio_post.tif'), post_ratio_db, profile, scale)
+            write_tif(os.path.join(outdir, 'delta_ratio_db.tif'), delta_ratio, profile, scale)
+
+        if quicklook:
+            import matplotlib.pyplot as plt
+            for name, cmap, vmin, vmax in [
+                ('VH_VV_ratio_pre.png', 'viridis', None, None),
+                ('VH_VV_ratio_post.png', 'viridis', None, None),
+                ('delta_ratio_db.png', 'RdBu', -5, 5),
+            ]:
+                arr = read_product(os.path.join(outdir, name.replace('.png', '.tif')), QUICKLOOK_SIDE)
+                plt.figure(figsize=(6,5))
+                # Axes stay in full-resolution pixel coordinates
+                plt.imshow(arr, cmap=cmap, vmin=vmin, vmax=vmax,
+                           extent=(0, profile['width'], profile['height'], 0))
+                plt.colorbar()
+                plt.title(name)
+                plt.tight_layout()
+                plt.savefig(os.path.join(outdir, name), dpi=200)
+                plt.close()
 
     print('Saved ratio products to', outdir)
 
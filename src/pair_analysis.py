@@ -0,0 +1,144 @@
+"""
+Pre/post VH/VV ratio comparison shared by the quick analysis scripts.
+
+run_pair reads the VV/VH rasters for two dates, writes both ratio GeoTIFFs and their
+difference, and saves a three-panel comparison figure; the print_* helpers report
+statistics on the returned arrays.
+"""
+import rasterio as rio
+import numpy as np
+from pathlib import Path
+
+from raster_io import block_mean, ratio_db
+
+# Longest side of the arrays handed to imshow; the figure panels are ~900px wide
+QUICKLOOK_SIDE = 1200
+
+
+def _read_pair(vv_path, vh_path):
+    with rio.open(vv_path) as src:
+        vv = src.read(1, out_dtype='float32')
+        profile = src.profile
+    with rio.open(vh_path) as src:
+        vh = src.read(1, out_dtype='float32')
+    return vv, vh, profile
+
+
+def run_pair(pre_vv, pre_vh, post_vv, post_vh, label, outdir='outputs',
+             tifs=('ratio_pre.tif', 'ratio_post.tif', 'delta_ratio.tif'),
+             dates=('Pre', 'Post'), suptitle=None):
+    """
+    Compute VH/VV ratios (dB) for both dates and their change (post - pre).
+
+    tifs names the pre, post and delta GeoTIFFs written to outdir; the figure is saved
+    as comparison_<label>.png with panels titled from dates. Passing suptitle adds a
+    figure title and switches to the larger report layout.
+    Returns (ratio_pre, ratio_post, delta).
+    """
+    print("Reading data...")
+    vv1, vh1, profile = _read_pair(pre_vv, pre_vh)
+    vv2, vh2, _ = _read_pair(post_vv, post_vh)
+
+    print(f"Pre shape: {vv1.shape}, Post shape: {vv2.shape}")
+
+    # If shapes don't match, crop to smaller size
+    if vv1.shape != vv2.shape:
+        print("Shapes don't match, cropping to common extent...")
+        min_rows = min(vv1.shape[0], vv2.shape[0])
+        min_cols = min(vv1.shape[1], vv2.shape[1])
+        vv1 = vv1[:min_rows, :min_cols]
+        vh1 = vh1[:min_rows, :min_cols]
+        vv2 = vv2[:min_rows, :min_cols]
+        vh2 = vh2[:min_rows, :min_cols]
+        print(f"Cropped to: {vv1.shape}")
+
+    # Compute ratios in place over the VH buffers; delta reuses a VV buffer
+    ratio1 = ratio_db(vh1, vv1)
+    ratio2 = ratio_db(vh2, vv2)
+    delta = np.subtract(ratio2, ratio1, out=vv2)
+
+    # Save outputs
+    Path(outdir).mkdir(exist_ok=True)
+
+    profile.update(height=ratio1.shape[0], width=ratio1.shape[1], dtype='float32')
+    for name, arr in zip(tifs, (ratio1, ratio2, delta)):
+        with rio.open(f'{outdir}/{name}', 'w', **profile) as dst:
+            dst.write(arr, 1)
+
+    print(f"Saved GeoTIFFs to {outdir}/")
+
+    # Create figure; matplotlib is only loaded once the rasters are written
+    import matplotlib.pyplot as plt
+    title_kw = dict(fontsize=14, fontweight='bold') if suptitle else {}
+    cbar_kw = dict(fraction=0.046) if suptitle else {}
+    fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+    panels = [
+        (ratio1, 'RdYlGn', -25, -5, f'{dates[0]} - VH/VV (dB)'),
+        (ratio2, 'RdYlGn', -25, -5, f'{dates[1]} - VH/VV (dB)'),
+        (delta, 'RdBu_r', -5, 5, 'Change (dB)'),
+    ]
+    for ax, (arr, cmap, vmin, vmax, title) in zip(axes, panels):
+        im = ax.imshow(block_mean(arr, QUICKLOOK_SIDE), cmap=cmap, vmin=vmin, vmax=vmax)
+        ax.set_title(title, **title_kw)
+        ax.axis('off')
+        plt.colorbar(im, ax=ax, **cbar_kw)
+
+    if suptitle:
+        plt.suptitle(suptitle, fontsize=16, fontweight='bold', y=0.98)
+    plt.tight_layout()
+    fig_path = f'{outdir}/comparison_{label}.png'
+    plt.savefig(fig_path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    print(f"Saved figure to {fig_path}")
+
+    return ratio1, ratio2, delta
+
+
+def _count_beyond(arr, thresh, block=1 << 20):
+    """
+    (count > thresh, count < -thresh) in one sweep over row blocks of ~``block`` cells,
+    so the comparison masks stay cache-sized instead of scene-sized.
+    """
+    rows = max(1, block // max(1, arr.shape[1]))
+    above = below = 0
+    for i in range(0, arr.shape[0], rows):
+        blk = arr[i:i + rows]
+        above += np.count_nonzero(blk > thresh)
+        below += np.count_nonzero(blk < -thresh)
+    return above, below
+
+
+def print_summary(ratio1, ratio2, delta):
+    """Short mean/std/extreme summary of both ratios and the change."""
+    print("\nStatistics:")
+    print(f"Pre ratio: mean={np.nanmean(ratio1):.2f}, std={np.nanstd(ratio1):.2f}")
+    print(f"Post ratio: mean={np.nanmean(ratio2):.2f}, std={np.nanstd(ratio2):.2f}")
+    print(f"Change: mean={np.nanmean(delta):.2f}, std={np.nanstd(delta):.2f}")
+    print(f"Max increase: {np.nanmax(delta):.2f} dB")
+    print(f"Max decrease: {np.nanmin(delta):.2f} dB")
+
+
+def print_change_report(ratio1, ratio2, delta, pre_name, post_name, period):
+    """Extended report: change distribution plus counts of significant (>3 dB) changes."""
+    print("\n" + "="*60)
+    print(f"STATISTICS - {period}")
+    print("="*60)
+    print(f"{pre_name} VH/VV ratio:  mean = {np.nanmean(ratio1):6.2f} dB, std = {np.nanstd(ratio1):.2f} dB")
+    print(f"{post_name} VH/VV ratio:  mean = {np.nanmean(ratio2):6.2f} dB, std = {np.nanstd(ratio2):.2f} dB")
+    print(f"\nChange statistics:")
+    print(f"  Mean change:         {np.nanmean(delta):6.2f} dB")
+    print(f"  Std of change:       {np.nanstd(delta):6.2f} dB")
+    print(f"  Maximum increase:    {np.nanmax(delta):6.2f} dB")
+    print(f"  Maximum decrease:    {np.nanmin(delta):6.2f} dB")
+    print(f"  Median change:       {np.nanmedian(delta):6.2f} dB")
+
+    # Count significant changes
+    significant_increase, significant_decrease = _count_beyond(delta, 3)
+    total_pixels = delta.size
+    pct_increase = (significant_increase / total_pixels) * 100
+    pct_decrease = (significant_decrease / total_pixels) * 100
+
+    print(f"\nSignificant changes (>3 dB):")
+    print(f"  Pixels with increase:  {significant_increase:8d} ({pct_increase:.2f}%)")
+    print(f"  Pixels with decrease:  {significant_decrease:8d} ({pct_decrease:.2f}%)")
+    print("="*60)
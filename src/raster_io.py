@@ -0,0 +1,82 @@
+"""
+Raster helpers shared by the figure, quicklook and web map scripts: decimated reads
+and the in-place VH/VV dB ratio kernel.
+
+Every preview is averaged down by one integer factor so its longest side is at most
+``max_side`` pixels; GDAL serves such reads from the closest overview when present.
+The web map scripts also take their overlay settings from here.
+"""
+import os
+import warnings
+import numpy as np
+import rasterio as rio
+from rasterio.enums import Resampling
+
+# Overlays are embedded in the HTML and shown at screen resolution
+MAX_OVERLAY_SIDE = 2048
+# zlib level for overlay PNGs: fast by default, SAR_MAP_PNG_LEVEL=9 for smaller HTML
+PNG_LEVEL = int(os.environ.get('SAR_MAP_PNG_LEVEL', 1))
+# GDAL tuning for overlay reads: bigger block cache, no sidecar directory scan
+OVERLAY_GDAL_ENV = dict(GDAL_CACHEMAX=512, GDAL_DISABLE_READDIR_ON_OPEN='EMPTY_DIR',
+                        VSI_CACHE=True, VSI_CACHE_SIZE=256 * 1024 * 1024)
+# Added to both bands before the log ratio so zero backscatter stays finite
+EPS = 1e-6
+
+
+def decimation_factor(height, width, max_side):
+    """Smallest integer factor that brings the longest side down to at most max_side."""
+    return max(1, -(-max(height, width) // max_side))
+
+
+def decimated_shape(height, width, max_side):
+    """(rows, cols) of a height x width grid averaged down by decimation_factor."""
+    f = decimation_factor(height, width, max_side)
+    return max(1, height // f), max(1, width // f)
+
+
+def read_decimated(ds: rio.DatasetReader, max_side=None, band=1, dtype='float32'):
+    """
+    Read one band of an open dataset as a masked array with nodata masked, in real
+    units: the band's scale and offset tags (e.g. int16 products) are applied.
+    With ``max_side`` the band is block-averaged during decode; None reads full size.
+    ``dtype=None`` keeps the band's own dtype unless scale/offset force float32.
+    """
+    out_shape = decimated_shape(ds.height, ds.width, max_side) if max_side else None
+    scale, offset = ds.scales[band - 1], ds.offsets[band - 1]
+    if dtype is None and (scale != 1 or offset):
+        dtype = 'float32'
+    arr = ds.read(band, out_shape=out_shape, resampling=Resampling.average,
+                  out_dtype=dtype, masked=True)
+    if scale != 1:
+        arr *= scale
+    if offset:
+        arr += offset
+    return arr
+
+
+def block_mean(arr, max_side):
+    """
+    In-memory counterpart of read_decimated for a 2-D array already read at full size.
+    NaNs are skipped like nodata in the decoded average; all-NaN blocks stay NaN.
+    """
+    f = decimation_factor(arr.shape[0], arr.shape[1], max_side)
+    if f == 1:
+        return arr
+    h, w = arr.shape[0] // f * f, arr.shape[1] // f * f
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # "Mean of empty slice" for all-NaN blocks
+        return np.nanmean(arr[:h, :w].reshape(h // f, f, w // f, f), axis=(1, 3))
+
+
+def ratio_db(vh, vv):
+    """10*log10((vh+eps)/(vv+eps)) written over ``vh`` in one in-place sweep; ``vv`` is clobbered.
+
+    Evaluated as log10(vh+eps) - log10(vv+eps): two vectorized logs and a subtract, no divide.
+    """
+    vh += EPS
+    vv += EPS
+    np.log10(vh, out=vh)
+    np.log10(vv, out=vv)
+    np.subtract(vh, vv, out=vh)
+    vh *= 10
+    return vh
@@ -1,9 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
+import sys
 from datetime import datetime
 import click
 import asf_search as asf
-from hyp3_sdk import HyP3, util
+from hyp3_sdk import Batch, HyP3
 from shapely.geometry import shape, box, mapping
 
 
@@ -60,12 +62,26 @@ def main(aoi, bbox, start, end, beam, radiometry, outdir, flight):
         return
 
     hyp3 = HyP3()
-    jobs = []
-    for r in results:
-        jobs.append(hyp3.submit_rtc_job(r, apply_thermal_noise_removal=True, radiometry=radiometry))
-    print(f'Submitted {len(jobs)} RTC jobs to HyP3')
+    # Each submission is a network round-trip; keep several in flight. Failures are
+    # handled per scene so the jobs that were accepted are still listed and watched.
+    batch, failed = Batch(), 0
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futures = [(r, ex.submit(hyp3.submit_rtc_job, r, apply_thermal_noise_removal=True,
+                                 radiometry=radiometry)) for r in results]
+        for r, fut in futures:
+            name = r.properties['sceneName']
+            try:
+                submitted = Batch() + fut.result()  # a Batch on current hyp3-sdk, a Job on older ones
+            except Exception as e:
+                print(f'Submit failed for {name}: {e}', file=sys.stderr)
+                failed += 1
+                continue
+            print(f'  {name}: job {", ".join(job.job_id for job in submitted)}')
+            batch += submitted
+    print(f'Submitted {len(batch)} RTC jobs to HyP3' + (f' ({failed} failed)' if failed else ''))
+    if not batch:
+        return
 
-    batch = util.Batch(jobs)
     batch = batch.watch()
     print('Jobs complete. Downloading...')
     batch.download(outdir)
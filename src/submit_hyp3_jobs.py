@@ -9,6 +9,7 @@ Requires Earthdata authentication for ASF (asf-search) and HyP3 account/token.
 See QUICKSTART.md for .netrc and login steps.
 """
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 import json
 from pathlib import Path
 from typing import Dict, List
@@ -60,10 +61,17 @@ def is_supported_satellite(scene_name: str) -> bool:
     return scene_name.startswith(('S1A_', 'S1B_'))
 
 
+def _scene_name(r) -> str:
+    """First available scene identifier of an ASF result ('' if none)."""
+    props = r.properties
+    return props.get('sceneName') or props.get('fileID') or ''
+
+
 @click.command()
 @click.option('--limit', default=2, show_default=True, help='Scenes per period (to limit volume).')
 @click.option('--dry-run', is_flag=True, help='Search only; do not submit jobs.')
-def main(limit: int, dry_run: bool) -> None:
+@click.option('--workers', type=int, default=8, show_default=True, help='Concurrent HyP3 submissions')
+def main(limit: int, dry_run: bool, workers: int) -> None:
     """Submit HyP3 RTC jobs for Sentinel-1 scenes over Reykjanes Peninsula."""
     data_dir = Path(OUTPUT_DIRS['raw']).parent
     jobs_meta_path = data_dir / 'hyp3_jobs.json'
@@ -90,19 +98,14 @@ def main(limit: int, dry_run: bool) -> None:
         
         # Filter to supported satellites (S1A/S1B only; exclude S1C)
         initial_count = len(results)
-        results = [r for r in results if is_supported_satellite(
-            r.properties.get('sceneName') or r.properties.get('fileID') or ''
-        )]
+        results = [r for r in results if is_supported_satellite(_scene_name(r))]
         
         if initial_count > len(results):
             print(f"  Filtered out {initial_count - len(results)} unsupported scenes (S1C)")
         
-        # Sort by acquisition date (newest first), then limit
-        results = sorted(
-            results, 
-            key=lambda r: r.properties.get('startTime', ''), 
-            reverse=True
-        )[:limit]
+        # Sort by acquisition date (newest first), then limit; sorts the filtered list in place
+        results.sort(key=lambda r: r.properties.get('startTime', ''), reverse=True)
+        del results[limit:]
         
         print(f"  Found {len(results)} supported scenes (limited to {limit})")
         all_results[period] = results
@@ -120,72 +123,87 @@ def main(limit: int, dry_run: bool) -> None:
     hyp3 = HyP3()
     submitted = []
     failed = []
+    rtc_params = dict(
+        include_dem=HYP3_PARAMS.get('include_dem', False),
+        include_inc_map=HYP3_PARAMS.get('include_inc_map', False),
+        include_rgb=HYP3_PARAMS.get('include_rgb', False),
+        include_scattering_area=HYP3_PARAMS.get('include_scattering_area', False),
+        radiometry=HYP3_PARAMS.get('radiometry', 'gamma0'),
+        resolution=HYP3_PARAMS.get('resolution', 30),
+        scale=HYP3_PARAMS.get('scale', 'power'),
+        speckle_filter=HYP3_PARAMS.get('speckle_filter', False),
+        dem_name=HYP3_PARAMS.get('dem_name', 'copernicus'),
+    )
 
+    # Resolve granules up front; each submission is then an independent round-trip
+    pending = []
     for period, results in all_results.items():
         for r in results:
             scene_name = r.properties.get('sceneName', 's1')
             name = f"reykjanes_{period}_{scene_name}"[:80]  # HyP3 name limit
-            
+
+            # Get granule identifier
+            granule_raw = (
+                r.properties.get('fileID') or 
+                r.properties.get('granuleName') or 
+                r.properties.get('sceneName')
+            )
             try:
-                # Get granule identifier
-                granule_raw = (
-                    r.properties.get('fileID') or 
-                    r.properties.get('granuleName') or 
-                    r.properties.get('sceneName')
-                )
-                
                 if not granule_raw:
                     raise ValueError('Missing granule identifier in ASF result')
-                
+
                 # Normalize granule name
                 granule = normalize_granule_name(granule_raw)
-                
+
                 if not granule:
                     raise ValueError(f'Invalid granule parsed from {granule_raw!r}')
-                
-                print(f"\nSubmitting: {granule}")
-                print(f"  Period: {period}")
-                print(f"  Job name: {name}")
-                
-                # Submit RTC job with parameters from config
-                batch = hyp3.submit_rtc_job(
-                    granule=granule,
-                    name=name,
-                    include_dem=HYP3_PARAMS.get('include_dem', False),
-                    include_inc_map=HYP3_PARAMS.get('include_inc_map', False),
-                    include_rgb=HYP3_PARAMS.get('include_rgb', False),
-                    include_scattering_area=HYP3_PARAMS.get('include_scattering_area', False),
-                    radiometry=HYP3_PARAMS.get('radiometry', 'gamma0'),
-                    resolution=HYP3_PARAMS.get('resolution', 30),
-                    scale=HYP3_PARAMS.get('scale', 'power'),
-                    speckle_filter=HYP3_PARAMS.get('speckle_filter', False),
-                    dem_name=HYP3_PARAMS.get('dem_name', 'copernicus'),
-                )
-                
-                # Handle Batch response (hyp3-sdk 7.7.3+)
-                if hasattr(batch, 'jobs') and batch.jobs:
-                    job = batch.jobs[0]
-                    job_info = {
+            except Exception as e:
+                print(f"  ✗ Submit failed: {e}", file=sys.stderr)
+                failed.append({'period': period, 'granule': granule_raw or scene_name, 'error': str(e)})
+                continue
+
+            print(f"\nSubmitting: {granule}")
+            print(f"  Period: {period}")
+            print(f"  Job name: {name}")
+            pending.append((period, granule, name))
+
+    def submit(job):
+        period, granule, name = job
+        # Submit RTC job with parameters from config
+        return hyp3.submit_rtc_job(granule=granule, name=name, **rtc_params)
+
+    if pending:
+        print(f"\nSubmitting {len(pending)} jobs ({min(workers, len(pending))} at a time)...")
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as ex:
+            # Collected in submission order so the metadata file is deterministic
+            futures = [(job, ex.submit(submit, job)) for job in pending]
+            for (period, granule, name), fut in futures:
+                try:
+                    batch = fut.result()
+
+                    # Handle Batch response (hyp3-sdk 7.7.3+)
+                    if hasattr(batch, 'jobs') and batch.jobs:
+                        job = batch.jobs[0]
+                        job_info = {
+                            'period': period,
+                            'name': job.name,
+                            'job_id': job.job_id,
+                            'granule': granule,
+                            'status': job.status_code,
+                        }
+                        submitted.append(job_info)
+                        print(f"  ✓ {granule}: Job ID {job.job_id} ({job.status_code})")
+                    else:
+                        raise ValueError("Unexpected response format from HyP3")
+
+                except Exception as e:
+                    error_msg = str(e)
+                    print(f"  ✗ Submit failed for {granule}: {error_msg}", file=sys.stderr)
+                    failed.append({
                         'period': period,
-                        'name': job.name,
-                        'job_id': job.job_id,
                         'granule': granule,
-                        'status': job.status_code,
-                    }
-                    submitted.append(job_info)
-                    print(f"  ✓ Job ID: {job.job_id}")
-                    print(f"  Status: {job.status_code}")
-                else:
-                    raise ValueError("Unexpected response format from HyP3")
-                    
-            except Exception as e:
-                error_msg = str(e)
-                print(f"  ✗ Submit failed: {error_msg}", file=sys.stderr)
-                failed.append({
-                    'period': period,
-                    'granule': granule_raw if 'granule_raw' in locals() else scene_name,
-                    'error': error_msg
-                })
+                        'error': error_msg
+                    })
 
     # Save metadata
     jobs_meta = {